@@ -0,0 +1,96 @@
+import numpy as np
+from solver import SolverCore, UNITS
+from typing import Iterable, Union
+
+# Tile indexes of each unit, shape (27, 9)
+UNIT_INDEXES = np.array(UNITS, dtype=np.intp)
+
+# The three units (row, column and box) containing each tile, shape (81, 3)
+TILE_UNITS = np.array([[unit for unit in range(27) if index in UNITS[unit]]
+                       for index in range(81)], dtype=np.intp)
+
+
+def to_array(boards: Union[np.ndarray, Iterable]) -> np.ndarray:
+    """
+    Convert boards to an (N, 81) array of int8, row by row with 0 for a blank tile.
+    Boards may be given as an array of shape (N, 9, 9) or (N, 81), 9 by 9 lists, or encoded strings (see storage.encode_board).
+    """
+    if not isinstance(boards, np.ndarray):
+        boards = list(boards)
+        if boards and isinstance(boards[0], str):
+            text = "".join(boards).encode("ascii")
+            return (np.frombuffer(text, dtype=np.uint8) - ord("0")).astype(np.int8).reshape(-1, 81)
+    return np.asarray(boards, dtype=np.int8).reshape(-1, 81)
+
+
+def propagate(values: np.ndarray) -> np.ndarray:
+    """
+    Fill in naked and hidden singles on every board of an (N, 81) array at once, until none of the boards change.
+    The values array is updated in place, and the boards found to break the rules are returned as a boolean mask of shape (N,).
+    """
+    invalid = np.zeros(len(values), dtype=bool)
+    # Indexes of the boards still being propagated
+    active = np.arange(len(values))
+    digits = np.arange(1, 10, dtype=np.int8)
+
+    while len(active):
+        current = values[active]
+        empty = current == 0
+
+        # Bitplanes of the numbers placed in each tile (shape (n, 81, 9)) and used in each unit (shape (n, 27, 9))
+        placed = current[:, :, None] == digits
+        unit_counts = placed[:, UNIT_INDEXES].sum(axis=2)
+        used = unit_counts > 0
+
+        # A tile's candidates are the numbers not used by any of its units
+        candidates = ~used[:, TILE_UNITS].any(axis=2) & empty[:, :, None]
+        candidate_counts = candidates.sum(axis=2)
+
+        # Places each number can go in each unit, shape (n, 27, 9)
+        unit_candidates = candidates[:, UNIT_INDEXES]
+        place_counts = unit_candidates.sum(axis=2)
+
+        # A board is broken if a number is repeated in a unit, a blank tile has no candidates, or a number has nowhere to go in a unit
+        broken = (unit_counts > 1).any(axis=(1, 2)) | \
+            (empty & (candidate_counts == 0)).any(axis=1) | \
+            (~used & (place_counts == 0)).any(axis=(1, 2))
+
+        # Naked singles
+        naked = empty & (candidate_counts == 1)
+        fill = np.where(naked, candidates.argmax(axis=2) + 1, 0)
+
+        # Hidden singles, only used for tiles which aren't naked singles
+        board_numbers, unit_numbers, number = np.nonzero(
+            ~used & (place_counts == 1))
+        position = unit_candidates[board_numbers, unit_numbers, :, number].argmax(axis=1)
+        tiles = UNIT_INDEXES[unit_numbers, position]
+        hidden = fill[board_numbers, tiles] == 0
+        fill[board_numbers[hidden], tiles[hidden]] = number[hidden] + 1
+
+        invalid[active[broken]] = True
+        changed = (fill > 0).any(axis=1) & ~broken
+        values[active[changed]] += fill[changed].astype(np.int8)
+        active = active[changed]
+    return invalid
+
+
+def solve_many(boards: Union[np.ndarray, Iterable]) -> np.ndarray:
+    """
+    Solve a batch of boards, given in any of the forms accepted by to_array.
+    Constraint propagation is run on the whole batch at once, then any boards it can't finish are searched one at a time using the bitmask engine.
+    Returns an (N, 9, 9) array of the first solution found for each board, boards with no solution are left filled with 0.
+    """
+    values = to_array(boards).copy()
+    invalid = propagate(values)
+
+    # Search the boards which propagation alone couldn't finish
+    for number in np.nonzero(~invalid & (values == 0).any(axis=1))[0]:
+        solver = SolverCore(values[number].reshape(9, 9).tolist(), engine="bitmask")
+        solver.solve()
+        if solver.solutions:
+            values[number] = np.array(solver.solutions[0], dtype=np.int8).reshape(81)
+        else:
+            invalid[number] = True
+
+    values[invalid] = 0
+    return values.reshape(-1, 9, 9)
@@ -0,0 +1,130 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+# Directory containing the game modules, benchmarks are run from here so the puzzle store is found
+root_directory = os.path.dirname(os.path.abspath(__file__))
+
+# Script run in a fresh interpreter for each startup run, it prints the time taken to reach each stage
+# The time the process was launched is passed in as launched (wall clock time, as perf_counter can't be compared between processes)
+startup_script = """
+import time
+start = time.perf_counter()
+import sudoku
+imported = time.perf_counter()
+game = sudoku.Game({difficulty!r})
+created = time.perf_counter()
+game.open(frames=1)
+first_frame = time.perf_counter()
+launch_to_first_frame = time.time() - {launched!r}
+sudoku.Game({difficulty!r}).open(frames=1)
+second_game = time.perf_counter()
+print(launch_to_first_frame, imported - start, created - start, first_frame - start, second_game - first_frame)
+"""
+
+
+def benchmark_startup(runs: int, difficulty: str, headless: Optional[bool] = True) -> dict:
+    """
+    Measure the game's startup, each run starts a new interpreter so that nothing is already imported or cached.
+    Returns a dict of the median time (in seconds) to reach each stage.
+    """
+    env = dict(os.environ)
+    if headless:
+        # Use SDL's dummy drivers so that no window is needed
+        env.setdefault("SDL_VIDEODRIVER", "dummy")
+        env.setdefault("SDL_AUDIODRIVER", "dummy")
+    env["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+    stages = {
+        "Launch to first frame (including interpreter start)": [],
+        "Import sudoku": [],
+        "Create first Game": [],
+        "First frame": [],
+        "Second Game (first frame)": [],
+    }
+    timings = list(stages.values())
+    for _ in range(runs):
+        script = startup_script.format(difficulty=difficulty, launched=time.time())
+        result = subprocess.run([sys.executable, "-c", script],
+                                cwd=root_directory, env=env, capture_output=True, text=True, check=True)
+        for timing, value in zip(timings, result.stdout.split()[-len(timings):]):
+            timing.append(float(value))
+
+    return {stage: statistics.median(values) for stage, values in stages.items()}
+
+
+def benchmark_solve_many(count: int) -> dict:
+    """
+    Measure the throughput of batch_solver.solve_many against solving each board with the bitmask engine.
+    The boards are taken from the puzzle store, repeated until there are count of them.
+    Returns a dict of the boards solved per second by each method.
+    """
+    # Imported here, as NumPy is only needed for this benchmark
+    import batch_solver
+    import generator
+    from solver import SolverCore
+    from storage import board_items, decode_board
+
+    puzzles = generator.load_boards()
+    boards = [board for boards in puzzles.values()
+              for _, board in board_items(boards)]
+    if not boards:
+        raise ValueError("The puzzle store is empty, generate some puzzles first")
+    boards = (boards * (count // len(boards) + 1))[:count]
+
+    start = time.perf_counter()
+    batch_solver.solve_many(boards)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for board in boards:
+        SolverCore(decode_board(board), engine="bitmask").solve()
+    single_time = time.perf_counter() - start
+
+    return {
+        "solve_many": count / batch_time,
+        "SolverCore (bitmask)": count / single_time,
+    }
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        "benchmark.py", description="Sudoku performance benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    startup_parser = subparsers.add_parser(
+        "startup", description="Measure the cold start and time to first frame of the game")
+    startup_parser.add_argument("--runs", default=5, type=int,
+                                help="The number of runs to take the median of")
+    startup_parser.add_argument("--difficulty", default="easy",
+                                help="The difficulty of the game to start")
+    startup_parser.add_argument("--window", action="store_true",
+                                help="Open a real window rather than using SDL's dummy video driver")
+
+    solve_many_parser = subparsers.add_parser(
+        "solve-many", description="Measure the throughput of the NumPy batch solver")
+    solve_many_parser.add_argument("--count", default=10000, type=int,
+                                   help="The number of boards to solve")
+
+    namespace = parser.parse_args(argv)
+
+    if namespace.command == "startup":
+        results = benchmark_startup(
+            namespace.runs, namespace.difficulty, not namespace.window)
+        print(f"Median of {namespace.runs} runs:")
+        for stage, seconds in results.items():
+            print(f"  {stage}: {seconds * 1000:.1f} ms")
+    elif namespace.command == "solve-many":
+        results = benchmark_solve_many(namespace.count)
+        print(f"Solving {namespace.count} boards on a single core:")
+        for method, rate in results.items():
+            print(f"  {method}: {rate:.0f} boards/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,70 @@
+from itertools import permutations, product
+from typing import List, Union
+
+# The 6 orderings of 3 rows, columns, bands or stacks
+PERMS = list(permutations(range(3)))
+
+# Upper limit on the number of arrangements compared in full for one board
+MAX_ARRANGEMENTS = 5000
+
+
+def canonical_form(board: Union[List[List[int]], str]) -> str:
+    """
+    Returns the canonical form of a board (given as a 9 by 9 list or an encoded string) as an encoded string.
+    Boards which are the same up to transposition, rotation, swapping bands or stacks, swapping rows or columns within a band or stack, and relabelling numbers all have the same canonical form.
+
+    The arrangement of rows and columns is chosen in two passes:
+        The pattern of clues is minimised first. For each transposition and column arrangement, the best row arrangement can be found by sorting, so only 2592 arrangements are tried.
+        The arrangements with the minimal clue pattern are then compared in full, with the numbers relabelled in order of first appearance.
+    Only MAX_ARRANGEMENTS arrangements are compared in full. Highly symmetrical boards with more ties than that can get a form which isn't the minimum.
+    Equivalent boards could then get different forms, but different boards never share a form, as every form is an arrangement of its board.
+    """
+    if isinstance(board, str):
+        cells = [int(value) for value in board]
+    else:
+        cells = [value for row in board for value in row]
+    transposed = [cells[y * 9 + x] for x in range(9) for y in range(9)]
+
+    # First pass, find the arrangements with the minimal pattern of clues
+    best_key = None
+    ties = []
+    for grid in (cells, transposed):
+        # Pattern of clues in each stack of each row, for each ordering of the stack's columns
+        patterns = [[[(grid[row * 9 + stack * 3 + perm[0]] != 0) << 2 | (grid[row * 9 + stack * 3 + perm[1]] != 0) << 1 | (grid[row * 9 + stack * 3 + perm[2]] != 0)
+                      for perm in PERMS] for stack in range(3)] for row in range(9)]
+        for stacks in PERMS:
+            for orders in product(range(6), repeat=3):
+                masks = [row[stacks[0]][orders[0]] << 6 | row[stacks[1]][orders[1]] << 3 | row[stacks[2]][orders[2]]
+                         for row in patterns]
+                # The smallest row arrangement sorts the rows within each band, then sorts the bands
+                key = sorted(tuple(sorted(masks[band * 3:band * 3 + 3]))
+                             for band in range(3))
+                if best_key is None or key < best_key:
+                    best_key = key
+                    ties = [(grid, stacks, orders, masks)]
+                elif key == best_key:
+                    ties.append((grid, stacks, orders, masks))
+
+    # Second pass, compare every arrangement with the minimal pattern in full
+    best = None
+    compared = 0
+    for grid, stacks, orders, masks in ties:
+        columns = [stack * 3 + PERMS[order][i]
+                   for stack, order in zip(stacks, orders) for i in range(3)]
+        # The orderings of the rows within each band which sort them, and the orderings of the bands which sort those
+        band_rows = [[[band * 3 + i for i in perm] for perm in PERMS
+                      if masks[band * 3 + perm[0]] <= masks[band * 3 + perm[1]] <= masks[band * 3 + perm[2]]]
+                     for band in range(3)]
+        band_orders = [perm for perm in PERMS if all(
+            tuple(sorted(masks[perm[i] * 3:perm[i] * 3 + 3])) == best_key[i] for i in range(3))]
+        for bands in band_orders:
+            for rows in product(*(band_rows[band] for band in bands)):
+                labels = {}
+                form = "".join([str(labels.setdefault(grid[row * 9 + column], len(labels) + 1)) if grid[row * 9 + column] else "0"
+                                for band in rows for row in band for column in columns])
+                if best is None or form < best:
+                    best = form
+                compared += 1
+                if compared >= MAX_ARRANGEMENTS:
+                    return best
+    return best
@@ -1,30 +1,55 @@
-from solver import Solver
+from solver import SolverCore, RemovalChecker
+from storage import PuzzleLog, PuzzleIndex, board_items, encode_board, decode_board
+from rating import rate_board
+from canonical import canonical_form
 import random
-import json
 from multiprocessing import Pool
 import shlex
 import argparse
 import string
 import os
+import sys
+import time
+import traceback
+from functools import partial
 
-from typing import Any
+from typing import Any, Iterable, List, Optional, Tuple
 
 # Location the puzzles are stored
-puzzle_store = "puzzles.json"
+puzzle_store = "puzzles.jsonl"
 
+# Location of the old JSON puzzle store, its puzzles are still read and are moved into the puzzle store when it is compacted
+legacy_puzzle_store = "puzzles.json"
 
-def get_random_string(length: int) -> str:
-    """Function generates a random string and returns it."""
-    result = "".join([random.choice(string.ascii_letters +
-                                    string.digits) for i in range(length)])
+# Location of the memory mapped index of the puzzle store, used by the game to read single puzzles quickly
+puzzle_index = "puzzles.idx"
+
+# Location the game stores the puzzles it generates, they are moved into the puzzle store when it is compacted
+# These are kept apart from the puzzle store so that playing doesn't leave the index out of date
+puzzle_spool = "puzzles.spool.jsonl"
+
+
+def get_random_string(length: int, rng: Optional[random.Random] = None) -> str:
+    """
+    Function generates a random string and returns it.
+    The characters are chosen using the given random.Random instance, or a new unseeded one if none is given.
+    """
+    if rng is None:
+        rng = random.Random()
+    result = "".join([rng.choice(string.ascii_letters +
+                                 string.digits) for i in range(length)])
     return result
 
 
 def generate_puzzle(seed: Any) -> dict:
-    """Generate a dict of boards (one for each difficulty)"""
+    """
+    Generate a dict of boards (one for each difficulty).
+    The solved board and the clue removal sequence are shared by all of the difficulties, so each harder board is the easier board with more clues removed.
+    All of the random choices are made using a random.Random instance created for this call, so puzzles can be generated on several threads at once and the same seed always generates the same boards.
+    """
 
-    def _generate(difficulty_scalar: float, seed: Any):
-        """Generate a puzzle of a given difficulty"""
+    def _generate(difficulty_mapping: dict, seed: Any) -> dict:
+        """Generate a puzzle for each of the difficulties in the given mapping of difficulty names to scalars."""
         def is_valid(board, pos, value):
             """Validates the current board setup."""
             # Check all tiles in the same group, row, and collumn as the tile in the given position
@@ -37,7 +62,7 @@ def generate_puzzle(seed: Any) -> dict:
                                 return False
             return True
 
-        def inital_random():
+        def inital_random(rng):
             """Randomly allocate values to a random row, this then causes the rest of the generated solution to change.
             Function retrusn the board variable (list of 9 rows of the sudoku board)."""
             board = [
@@ -51,39 +76,43 @@ def generate_puzzle(seed: Any) -> dict:
                 [0, 0, 0, 0, 0, 0, 0, 0, 0],
                 [0, 0, 0, 0, 0, 0, 0, 0, 0]
             ]
-            y = random.randint(0, 8)
+            y = rng.randint(0, 8)
             for x in range(0, 9):
                 while True:
-                    value = random.randint(1, 9)
+                    value = rng.randint(1, 9)
                     if is_valid(board, [x, y], value):
                         board[x][y] = value
                         break
-            a = Solver(board)
+            # The backtrack engine is used here as it always finds the same first solution, so seeds keep producing the same boards
+            a = SolverCore(board)
             a.solve()
             return a.solutions[0]
 
-        def remove_tiles(board, difficulty_scalar):
+        def remove_tiles(rng, board, difficulty_mapping):
             """This function removes tiles randomly from the board in order to produce a partially filled board with the minimum number of required clues.\n
-            Difficulty scalar is a number between 0 and 1, 0 would mean that all of the clues are present on the board (already complete) whereas 1 would try to remove as many as possible.\n
+            Difficulty scalars are numbers between 0 and 1, 0 would mean that all of the clues are present on the board (already complete) whereas 1 would try to remove as many as possible.\n
+            A single removal pass is made, with a copy of the board taken as each difficulty's target is reached. These copies are returned in a dict keyed by difficulty name.\n
             Harder puzzles do take longer to generate as it requies more passes."""
             unvisited = []
             for x in range(0, 9):
                 for y in range(0, 9):
                     unvisited.append([x, y])
-            # Scale the minimum_unvisited to the difficulty scalar to control how many numbers may be removed from the board.
+            # Scale the minimum_unvisited to each difficulty scalar to control how many numbers may be removed from the board.
             # This value is floored to 17, as there are no boards with unique solutions with fewer than 17 clues
-            minimum_unvisited = 17 + (64 * (1 - difficulty_scalar))
-            while len(unvisited) > minimum_unvisited:
-                random_num = random.randint(0, len(unvisited) - 1)
-                pos = unvisited.pop(random_num)
-                value_removed = board[pos[0]][pos[1]]
-                board[pos[0]][pos[1]] = 0
-                a = Solver(board, no_of_solutions=2)
-                a.solve()
-                if len(a.solutions) > 1:
-                    board[pos[0]][pos[1]] = value_removed
-
-        def blender(board):
+            targets = sorted(((17 + (64 * (1 - difficulty_scalar)), difficulty) for difficulty,
+                              difficulty_scalar in difficulty_mapping.items()), reverse=True)
+            # The checker keeps its candidate masks between removals, and clears the tiles it removes from the board
+            checker = RemovalChecker(board)
+            snapshots = {}
+            for minimum_unvisited, difficulty in targets:
+                while len(unvisited) > minimum_unvisited:
+                    random_num = rng.randint(0, len(unvisited) - 1)
+                    pos = unvisited.pop(random_num)
+                    checker.remove(pos)
+                snapshots[difficulty] = [row[:] for row in board]
+            return snapshots
+
+        def blender(rng, board):
             """This mixes the columns and rows randomly in order to make the board look more random."""
             def blend_rows():
                 # Iterate over each band of 3 rows
@@ -91,7 +120,7 @@ def generate_puzzle(seed: Any) -> dict:
                     # Iterate over the 3 rows in the band.
                     for row_num in range(x, x+3):
                         # Select a random row from the band
-                        random_row = random.randint(x, x+2)
+                        random_row = rng.randint(x, x+2)
                         # Switch the specified rows
                         board[row_num], board[random_row] = board[random_row], board[row_num]
 
@@ -101,7 +130,7 @@ def generate_puzzle(seed: Any) -> dict:
                     # Iterate over the 3 columns in the band.
                     for column_num in range(y, y+3):
                         # Select a random colu n from the band
-                        random_column = random.randint(y, y+2)
+                        random_column = rng.randint(y, y+2)
                         # Switch the specified columns
                         for row_num in range(0, 9):
                             board[row_num][column_num], board[row_num][random_column] = board[
@@ -110,12 +139,11 @@ def generate_puzzle(seed: Any) -> dict:
             blend_rows()
             blend_columns()
 
-        # Set the seed, allowing for the same board to be genereated again with the same seed.
-        random.seed(seed)
-        board = inital_random()
-        blender(board)
-        remove_tiles(board, difficulty_scalar)
-        return board
+        # Seed a random generator for this call, allowing for the same board to be genereated again with the same seed.
+        rng = random.Random(seed)
+        board = inital_random(rng)
+        blender(rng, board)
+        return remove_tiles(rng, board, difficulty_mapping)
 
     difficulty_mapping = {
         "easy": 0.5,
@@ -123,31 +151,347 @@ def generate_puzzle(seed: Any) -> dict:
         "hard": 1,
     }
 
+    boards = _generate(difficulty_mapping, seed)
+    # Return the boards in the same order as the mapping
     output = {}
     for difficulty in difficulty_mapping:
-        output[difficulty] = _generate(difficulty_mapping[difficulty], seed)
+        output[difficulty] = boards[difficulty]
     return output
 
 
-def load_boards() -> dict:
+def puzzle_form(boards: dict) -> str:
     """
-    Load the puzzles from file.
-    If the file doesn't exist, an empty dict will be returned.
+    Returns the canonical form of a puzzle (see canonical.canonical_form), used to find puzzles which are the same as another up to symmetry and relabelling.
+    The form is taken from the hard board, as the easier boards are made by removing fewer tiles from the same solution.
     """
+    return canonical_form(boards["hard"])
+
+
+def puzzle_rating(boards: dict) -> dict:
+    """Returns the rating of each board of a puzzle (see rating.rate_board), as stored under the "rating" key by generate_job."""
+    return {difficulty: rate_board(decode_board(board)) for difficulty, board in board_items(boards)}
+
+
+def index_forms(pool: Pool, puzzles: dict, store: Optional[PuzzleLog] = None) -> dict:
+    """
+    Returns a dict of canonical form to seed for the given puzzles dict.
+    Puzzles stored without a canonical form (by older versions) have it worked out using the pool, and added to their boards.
+    If the puzzles were loaded from a store, give the store so that it is compacted with the new forms, and they only need to be worked out once.
+    """
+    missing = [seed for seed, boards in puzzles.items() if "canonical" not in boards]
+    for seed, form in zip(missing, pool.imap(puzzle_form, [puzzles[seed] for seed in missing], 8)):
+        puzzles[seed]["canonical"] = form
+    if missing and store is not None:
+        store.compact(puzzle_form, puzzles)
+        print(f"Saved the canonical forms of {len(missing)} stored puzzles")
+
+    index = {}
+    for seed, boards in puzzles.items():
+        index.setdefault(boards["canonical"], seed)
+    return index
 
-    puzzles = dict()
+
+def generate_job(seed: Any) -> Tuple[Any, Optional[dict], Optional[str]]:
+    """
+    Pool worker function, generates and rates the puzzle for the given seed.
+    Returns the seed, the generated boards (encoded as strings, see storage.encode_board) and an error message.
+    The boards dict also holds the rating of each board (see rating.rate_board) under the "rating" key, and the canonical form of the puzzle (see puzzle_form) under the "canonical" key.
+    Exceptions are caught and returned as the error message (with the boards as None) so that one failure doesn't end the batch.
+    """
+    try:
+        boards = generate_puzzle(seed)
+        ratings = {}
+        for difficulty in boards:
+            ratings[difficulty] = rate_board(boards[difficulty])
+            boards[difficulty] = encode_board(boards[difficulty])
+        boards["rating"] = ratings
+        boards["canonical"] = puzzle_form(boards)
+        return seed, boards, None
+    except Exception:
+        return seed, None, traceback.format_exc()
+
+
+def generate_boards(pool: Pool, seeds: Iterable[Any], puzzles: dict, store: Optional[PuzzleLog] = None, chunksize: Optional[int] = 1, verbose: Optional[bool] = True) -> Tuple[int, int]:
+    """
+    Generate the puzzles for the given seeds using the pool, seeds already in the puzzles dict are skipped.
+    Puzzles with the same canonical form as one already in the puzzles dict are rejected, rather than stored again under another seed.
+    Each puzzle is added to the puzzles dict (and appended to the store if one is given) as soon as it is finished, and reported along with the progress and throughput of the batch.
+    Seeds are sent to the workers in chunks of chunksize, larger chunks reduce the IPC overhead on big batches.
+    When verbose is False, only a progress line (at most once a second) is printed rather than a line per puzzle.
+    Once finished, the number of boards of each difficulty in each rated level and the number of distinct puzzles are printed.
+    Returns the number of puzzles generated and the number of seeds which failed.
+    """
+    seeds = [seed for seed in dict.fromkeys(seeds) if seed not in puzzles]
+    # Hash index of the canonical form of each puzzle, used to reject duplicates
+    forms = index_forms(pool, puzzles, store)
+    generated, failed, rejected = 0, 0, 0
+    # Count of the boards of each difficulty in each rated level
+    levels = {}
+    start_time = time.perf_counter()
+    last_report = start_time
+    for seed, boards, error in pool.imap_unordered(generate_job, seeds, chunksize):
+        if error is None and boards["canonical"] in forms:
+            rejected += 1
+            if verbose:
+                print(f"Puzzle with seed '{seed}' is the same as the puzzle with seed '{forms[boards['canonical']]}', it was not stored")
+            continue
+        if error is None:
+            forms[boards["canonical"]] = seed
+            puzzles[seed] = boards
+            if store is not None:
+                store.append({seed: boards})
+            generated += 1
+            for difficulty, rating in boards.get("rating", {}).items():
+                counts = levels.setdefault(difficulty, {})
+                counts[rating["level"]] = counts.get(rating["level"], 0) + 1
+        else:
+            failed += 1
+            print(f"Failed to generate puzzle with seed '{seed}':\n{error}")
+            continue
+        now = time.perf_counter()
+        progress = f"({generated + failed + rejected}/{len(seeds)}, {generated / (now - start_time):.2f} puzzles/s)"
+        if verbose:
+            print(f"Puzzle generated with seed '{seed}' {progress}")
+        elif now - last_report >= 1 or generated + failed + rejected == len(seeds):
+            print(f"Generated {generated} puzzles {progress}")
+            last_report = now
+
+    for difficulty, counts in levels.items():
+        counts = ", ".join(f"{level} {count}" for level, count in counts.items())
+        print(f"{difficulty.capitalize()} boards by rated level: {counts}")
+    if rejected:
+        print(f"Rejected {rejected} puzzles which were the same as stored puzzles")
+    print(f"{len(forms)} of the {len(puzzles)} puzzles are distinct")
+    return generated, failed
+
+
+def verify_job(record: Tuple[Any, dict], check_seed: Optional[bool] = True, cross_check: Optional[bool] = False) -> Tuple[Any, List[str], List[float]]:
+    """
+    Pool worker function, checks every board of a (seed, boards) record from the store.
+    Each board must have exactly one solution, and if check_seed is True the seed must still generate the same boards.
+    If cross_check is True, each solution is also checked against the one found by the DLX engine.
+    Returns the seed, a list describing each problem found and the time taken to solve each board.
+    """
+    seed, boards = record
+    problems, times = [], []
     try:
-        with open(puzzle_store, "r") as file:
-            puzzles = json.load(file)
+        for difficulty, board in board_items(boards):
+            start = time.perf_counter()
+            solver = SolverCore(decode_board(board), no_of_solutions=2, engine="bitmask")
+            solver.solve()
+            times.append(time.perf_counter() - start)
+            if len(solver.solutions) == 0:
+                problems.append(f"{difficulty} board has no solution")
+            elif len(solver.solutions) > 1:
+                problems.append(f"{difficulty} board does not have a unique solution")
+            elif cross_check:
+                dlx = SolverCore(decode_board(board), no_of_solutions=2, engine="dlx")
+                dlx.solve()
+                if dlx.solutions != solver.solutions:
+                    problems.append(f"{difficulty} board is solved differently by the DLX engine")
+
+        if check_seed:
+            generated = generate_puzzle(seed)
+            for difficulty, board in generated.items():
+                if boards.get(difficulty) != encode_board(board):
+                    problems.append(f"{difficulty} board does not match the board generated by its seed")
+    except Exception:
+        problems.append(traceback.format_exc())
+    return seed, problems, times
+
+
+def verify_boards(pool: Pool, records: Iterable[Tuple[Any, dict]], check_seed: Optional[bool] = True, cross_check: Optional[bool] = False, chunksize: Optional[int] = 1) -> Tuple[int, int]:
+    """
+    Check the given (seed, boards) records from the store using the pool (see verify_job), printing each problem as it is found.
+    Once finished, the solve time percentiles and throughput are printed.
+    Returns the number of puzzles checked and the number which had problems.
+    """
+    checked, failed = 0, 0
+    times = []
+    start_time = time.perf_counter()
+    job = partial(verify_job, check_seed=check_seed, cross_check=cross_check)
+    for seed, problems, board_times in pool.imap_unordered(job, records, chunksize):
+        checked += 1
+        times += board_times
+        if problems:
+            failed += 1
+            for problem in problems:
+                print(f"Puzzle with seed '{seed}': {problem}")
+    elapsed = time.perf_counter() - start_time
+
+    if times:
+        times.sort()
+        percentiles = ", ".join(f"p{percentile} {times[min(len(times) - 1, len(times) * percentile // 100)] * 1000:.2f}ms"
+                                for percentile in (50, 90, 99))
+        print(f"Solve times for {len(times)} boards: {percentiles}, max {times[-1] * 1000:.2f}ms")
+    if elapsed > 0:
+        print(f"Checked {checked} puzzles in {elapsed:.2f}s ({checked / elapsed:.2f} puzzles/s, {len(times) / elapsed:.2f} boards/s)")
+    return checked, failed
+
+
+def open_store(path: Optional[str] = None) -> PuzzleLog:
+    """
+    Open the puzzle store at the given path.
+    If no path is given, the puzzle storage location is used, along with the legacy puzzle store.
+    """
+    if path is None:
+        return PuzzleLog(puzzle_store, legacy_puzzle_store)
+    return PuzzleLog(path)
+
+
+def open_spool() -> PuzzleLog:
+    """Open the store of puzzles generated by the game (see PuzzleProducer)."""
+    return PuzzleLog(puzzle_spool)
+
+
+def load_boards(path: Optional[str] = None) -> dict:
+    """
+    Load the puzzles from the store (the puzzle storage location unless a path is given).
+    The boards are returned as encoded strings, use storage.decode_board to turn them back into lists.
+    If the store doesn't exist, an empty dict will be returned.
+    """
+    return open_store(path).load()
+
+
+def save_boards(boards: dict, path: Optional[str] = None) -> None:
+    """Append the given boards to the store (the puzzle storage location unless a path is given)."""
+    open_store(path).append(boards)
+
+
+def compact_boards(path: Optional[str] = None) -> int:
+    """
+    Compact the store (the puzzle storage location unless a path is given), returns the number of puzzles in it.
+    Puzzles with the same canonical form as an earlier puzzle are dropped, and the canonical form and rating are added to puzzles stored without them.
+    When compacting the puzzle storage location, the puzzles generated by the game are moved into it and its index is rebuilt as well.
+    """
+    store = open_store(path)
+    if path is None:
+        puzzles = store.load()
+        spool = open_spool()
+        for seed, boards in spool.records():
+            puzzles.setdefault(seed, boards)
+        count = store.compact(puzzle_form, puzzles, rate=puzzle_rating)
+        # The spooled puzzles are now stored in the puzzle store
+        if os.path.exists(spool.path):
+            os.remove(spool.path)
+        build_index()
+    else:
+        count = store.compact(puzzle_form, rate=puzzle_rating)
+    return count
+
+
+def build_index(path: Optional[str] = None, store_path: Optional[str] = None) -> int:
+    """
+    Rebuild the index at path (the puzzle index location unless given) from the store at store_path (the puzzle storage location unless given).
+    Returns the number of puzzles in the index.
+    """
+    return PuzzleIndex.build(path or puzzle_index, open_store(store_path).records())
+
+
+def index_stale(path: Optional[str] = None, store_path: Optional[str] = None) -> bool:
+    """Returns True if the index at path (the puzzle index location unless given) is missing, or older than the store at store_path (the puzzle storage location unless given)."""
+    store = open_store(store_path)
+    sources = [store.path]
+    if store.legacy_path is not None:
+        sources.append(store.legacy_path)
+    try:
+        index_time = os.path.getmtime(path or puzzle_index)
     except FileNotFoundError:
-        pass
-    return puzzles
+        return True
+    return any(os.path.exists(source) and os.path.getmtime(source) > index_time for source in sources)
 
 
-def save_boards(boards: dict) -> None:
-    """Save the given boards to the puzzle storage location."""
-    with open(puzzle_store, "w") as file:
-        json.dump(boards, file, indent=4)
+def open_index(path: Optional[str] = None, store_path: Optional[str] = None, rebuild: Optional[bool] = True) -> Optional[PuzzleIndex]:
+    """
+    Open the index at path (the puzzle index location unless given).
+    The index is rebuilt from the store at store_path (the puzzle storage location unless given) first if it is missing, older than the store, or was written by another version.
+    If rebuild is False, the index is opened even if it is older than the store, and None is returned rather than building a missing index.
+    """
+    path = path or puzzle_index
+    if not rebuild or not index_stale(path, store_path):
+        try:
+            return PuzzleIndex(path)
+        except (FileNotFoundError, ValueError):
+            if not rebuild:
+                return None
+    build_index(path, store_path)
+    return PuzzleIndex(path)
+
+
+def batch_main(argv: List[str]) -> int:
+    """
+    Non-interactive entry point, runs a single command from the given command line arguments.
+    Returns the exit status, 0 on success or 1 if any puzzle failed to generate or verify.
+    """
+    parser = argparse.ArgumentParser(
+        "generator.py", description="Sudoku puzzle generator, run without arguments for the interactive generator")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    gen_parser = subparsers.add_parser(
+        "gen", description="Generate new sudoku boards")
+    gen_parser.add_argument("number",
+                            help="The number of puzzles to generate", type=int)
+    gen_parser.add_argument("--workers", default=None, type=int,
+                            help="The number of worker processes, defaults to the number of CPUs")
+    gen_parser.add_argument("--chunksize", default=1, type=int,
+                            help="The number of seeds sent to a worker at once")
+    gen_parser.add_argument("--out", default=None,
+                            help="The file to store the puzzles in")
+    gen_parser.add_argument("--seed-prefix", default=None,
+                            help="Use the seeds <prefix>0 to <prefix>N-1 instead of random seeds, so the batch can be repeated")
+    gen_parser.add_argument("--verbose", action="store_true",
+                            help="Print a line for every puzzle generated")
+
+    compact_parser = subparsers.add_parser(
+        "compact", description="Rewrite the puzzle store without duplicate or damaged records")
+    compact_parser.add_argument("--out", default=None,
+                                help="The puzzle store to compact")
+
+    verify_parser = subparsers.add_parser(
+        "verify", description="Check that every board in the puzzle store has a unique solution and matches its seed")
+    verify_parser.add_argument("--workers", default=None, type=int,
+                               help="The number of worker processes, defaults to the number of CPUs")
+    verify_parser.add_argument("--chunksize", default=8, type=int,
+                               help="The number of puzzles sent to a worker at once")
+    verify_parser.add_argument("--out", default=None,
+                               help="The puzzle store to verify")
+    verify_parser.add_argument("--skip-seeds", action="store_true",
+                               help="Don't regenerate each puzzle from its seed")
+    verify_parser.add_argument("--cross-check", action="store_true",
+                               help="Also check each solution against the DLX engine")
+
+    namespace = parser.parse_args(argv)
+
+    if namespace.command == "compact":
+        print(f"Compacted store holds {compact_boards(namespace.out)} distinct puzzles")
+        return 0
+
+    if namespace.command == "verify":
+        print("Verifying puzzles...")
+        with Pool(namespace.workers) as pool:
+            checked, failed = verify_boards(pool, open_store(namespace.out).records(),
+                                            not namespace.skip_seeds, namespace.cross_check, namespace.chunksize)
+        print(f"Verification complete, {failed} of {checked} puzzles have problems")
+        return 1 if failed else 0
+
+    if namespace.seed_prefix is None:
+        seeds = [get_random_string(10) for _ in range(namespace.number)]
+    else:
+        seeds = [f"{namespace.seed_prefix}{i}" for i in range(namespace.number)]
+
+    store = open_store(namespace.out)
+    puzzles = store.load()
+    print(f"Generating {namespace.number} boards...")
+    start_time = time.perf_counter()
+    with Pool(namespace.workers) as pool:
+        generated, failed = generate_boards(
+            pool, seeds, puzzles, store, namespace.chunksize, namespace.verbose)
+    # Bring the index up to date here, so the game doesn't have to
+    if namespace.out is None:
+        build_index()
+    elapsed = time.perf_counter() - start_time
+    print(f"Generation complete, {generated} generated and {failed} failed in {elapsed:.2f}s")
+    return 1 if failed else 0
 
 
 def main():
@@ -157,6 +501,14 @@ def main():
     gen_parser.add_argument("number", default=1,
                             help="The number of puzzles to generate", type=int)
 
+    # Create the compact arg parser
+    compact_parser = argparse.ArgumentParser(
+        "compact", description="Rewrite the puzzle store without duplicate or damaged records")
+
+    # Create the verify arg parser
+    verify_parser = argparse.ArgumentParser(
+        "verify", description="Check that every board in the puzzle store has a unique solution and matches its seed")
+
     # Create the exit and help arg parsers
     exit_parser = argparse.ArgumentParser(
         "exit", description="Exit the generator")
@@ -166,6 +518,8 @@ def main():
     # Create dict of parser for printing help message
     parser_dict = {
         gen_parser.prog: gen_parser,
+        compact_parser.prog: compact_parser,
+        verify_parser.prog: verify_parser,
         exit_parser.prog: exit_parser,
         help_parser.prog: help_parser
     }
@@ -174,7 +528,8 @@ def main():
     pool = Pool()
 
     # Load existing puzzles
-    puzzles = load_boards()
+    store = open_store()
+    puzzles = store.load()
 
     running = True
     print("--==Sudoku Puzzle Generator==--")
@@ -186,6 +541,8 @@ def main():
         try:
             if command[0] == "help":
                 print(f"gen - {gen_parser.description}")
+                print(f"compact - {compact_parser.description}")
+                print(f"verify - {verify_parser.description}")
                 print(f"help - {help_parser.description}")
                 print(f"exit - {exit_parser.description}")
                 print("Enter a command followed by -h for help.")
@@ -195,41 +552,31 @@ def main():
                 # Extract the namespace from the parser
                 namespace = parser_dict[command[0]].parse_args(command[1:])
 
-                results = []
                 print(f"Generating {namespace.number} boards...")
                 # Create a number of boards equal to the number requested
-                for _ in range(namespace.number):
-                    seed = get_random_string(10)
-
-                    result_obj = pool.apply_async(generate_puzzle, (seed,))
-
-                    results.append((seed, result_obj))
-
-                # Collect the results from the results object dict, continue until we have all of them
-                got_all = False
-                while not got_all:
-                    for result in results:
-                        got_all = True
-                        try:
-                            # If the seed is not already present in the puzzles
-                            if result[0] not in puzzles:
-                                puzzles[result[0]] = result[1].get(0.25)
-                                print(
-                                    f"Puzzle generated with seed '{result[0]}'")
-                        except:
-                            # If we fail to get one of the puzzles
-                            got_all = False
-
-                save_boards(puzzles)
-                print("Generation complete")
+                seeds = [get_random_string(10)
+                         for _ in range(namespace.number)]
+                start_time = time.perf_counter()
+                generated, failed = generate_boards(
+                    pool, seeds, puzzles, store)
+                # Bring the index up to date here, so the game doesn't have to
+                build_index()
+                elapsed = time.perf_counter() - start_time
+                print(f"Generation complete, {generated} generated and {failed} failed in {elapsed:.2f}s")
+            elif command[0] == "compact":
+                parser_dict[command[0]].parse_args(command[1:])
+                print(f"Compacted store holds {compact_boards()} distinct puzzles")
+            elif command[0] == "verify":
+                parser_dict[command[0]].parse_args(command[1:])
+                checked, failed = verify_boards(pool, store.records(), chunksize=8)
+                print(f"Verification complete, {failed} of {checked} puzzles have problems")
 
         except SystemExit:
             # Catch the system exit exception raised by argparse if it fails
             pass
 
-    # Save our changes
-    save_boards(puzzles)
-
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(batch_main(sys.argv[1:]))
     main()
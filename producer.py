@@ -0,0 +1,114 @@
+import threading
+from collections import deque
+import multiprocessing
+from generator import generate_job, get_random_string
+from storage import LEVEL_DIFFICULTIES, PuzzleIndex, PuzzleLog, decode_board, rated_items
+from typing import List, Optional
+
+
+class PuzzleProducer(object):
+    """
+    Background producer which generates puzzles ahead of time, so that the game has fresh boards ready even when the puzzle store is empty.
+    Puzzles are generated on a process pool, and the boards of each finished puzzle are added to a bounded in-memory queue per difficulty, by the difficulty they are rated as (see storage.rated_items).
+    Whenever a board is taken, more puzzles are generated until every queue is full again.
+        Init parameters:
+            capacity (int) - The number of boards to hold ready for each difficulty.
+            workers (int) - The number of worker processes, kept low so the game itself isn't slowed down.
+            store (PuzzleLog) - Optional store to append each new puzzle to, so that they aren't lost when the game closes.
+            index (PuzzleIndex) - Optional index of the main puzzle store, puzzles with the same canonical form as one in the index (or already in the store) aren't appended to the store.
+        How to use:
+            Call .start to begin generating, .take to get a board and .close to stop the workers.
+    """
+
+    def __init__(self, capacity: Optional[int] = 4, workers: Optional[int] = 1, store: Optional[PuzzleLog] = None, index: Optional[PuzzleIndex] = None):
+        self.capacity = capacity
+        self.workers = workers
+        self.store = store
+        self.index = index
+
+        # Encoded boards ready for each difficulty, oldest first
+        self.__queues = {difficulty: deque() for difficulty in LEVEL_DIFFICULTIES.values()}
+        # Guards the queues and pending count, and is notified whenever boards are added
+        self.__condition = threading.Condition()
+        # Number of puzzles submitted to the pool which haven't finished yet
+        self.__pending = 0
+        self.__pool = None
+        self.__closed = False
+        # Canonical forms of the puzzles in the store, read by .start
+        self.__forms = set()
+
+    def start(self):
+        """Start the worker processes and begin filling the queues, does nothing if already started."""
+        if self.store is not None:
+            forms = {boards["canonical"] for _, boards in self.store.records() if "canonical" in boards}
+        with self.__condition:
+            if self.store is not None:
+                self.__forms |= forms
+            if self.__pool is None and not self.__closed:
+                # Workers are spawned rather than forked, forked workers would inherit the signal handlers installed by pygame and ignore being terminated
+                self.__pool = multiprocessing.get_context("spawn").Pool(self.workers)
+                self.__fill()
+
+    def ready(self, difficulty: str) -> int:
+        """Returns the number of boards ready for the given difficulty."""
+        with self.__condition:
+            return len(self.__queues.get(difficulty, ()))
+
+    def take(self, difficulty: str, timeout: Optional[float] = None) -> Optional[List[List[int]]]:
+        """
+        Take the oldest ready board of the given difficulty, the board is returned decoded.
+        If none are ready, this waits for up to timeout seconds (forever if timeout is None) for one to be generated.
+        Returns None if no board was ready in time, or the producer isn't running.
+        """
+        with self.__condition:
+            self.__condition.wait_for(lambda: self.__queues.get(difficulty) or self.__pool is None,
+                                      timeout)
+            queue = self.__queues.get(difficulty)
+            if not queue:
+                return None
+            board = queue.popleft()
+            self.__fill()
+        return decode_board(board)
+
+    def close(self):
+        """Stop the worker processes, any puzzles still being generated are lost."""
+        with self.__condition:
+            self.__closed = True
+            pool, self.__pool = self.__pool, None
+            self.__condition.notify_all()
+        if pool is not None:
+            pool.terminate()
+
+    def __fill(self):
+        """Submit enough puzzles to the pool to fill every queue once they finish, must be called holding the condition."""
+        if self.__pool is None:
+            return
+        # Keep as many puzzles in progress as the emptiest queue needs, not every puzzle has a board rated for every queue, so this is called again as each one finishes
+        shortfall = max([self.capacity - len(queue) for queue in self.__queues.values()],
+                        default=self.capacity)
+        while self.__pending < shortfall:
+            self.__pending += 1
+            self.__pool.apply_async(generate_job, (get_random_string(10),),
+                                    callback=self.__finished)
+
+    def __finished(self, result):
+        """Pool callback, adds the boards of a finished puzzle to the queues."""
+        seed, boards, error = result
+        with self.__condition:
+            self.__pending -= 1
+            if error is None:
+                for difficulty, board in rated_items(boards):
+                    queue = self.__queues.setdefault(difficulty, deque())
+                    if len(queue) < self.capacity:
+                        queue.append(board)
+                self.__condition.notify_all()
+            self.__fill()
+
+        # Puzzles equivalent to a stored puzzle can still be played, but aren't stored again
+        if error is None and self.store is not None:
+            form = boards["canonical"]
+            with self.__condition:
+                stored = form in self.__forms or (self.index is not None and self.index.has_form(form))
+                self.__forms.add(form)
+            if not stored:
+                self.store.append({seed: boards})
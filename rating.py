@@ -0,0 +1,214 @@
+from solver import ALL_CANDIDATES, BIT_VALUE, BOX_OF, COL_OF, ROW_OF, UNITS
+from typing import Callable, List, Tuple
+
+# The 20 other tiles sharing a row, column or box with each tile
+PEERS = [[j for j in range(81) if j != i and (ROW_OF[j] == ROW_OF[i] or COL_OF[j] == COL_OF[i] or BOX_OF[j] == BOX_OF[i])]
+         for i in range(81)]
+
+# The rows, columns and boxes, split up so the line/box interactions can be checked
+ROW_UNITS = UNITS[0:9]
+COL_UNITS = UNITS[9:18]
+BOX_UNITS = UNITS[18:27]
+
+# Score added each time a technique is used, ordered from easiest to hardest
+TECHNIQUE_SCORES = {
+    "naked_single": 1,
+    "hidden_single": 2,
+    "locked_candidates": 4,
+    "naked_pair": 6,
+    "hidden_pair": 8,
+    "x_wing": 12,
+    # Used when none of the techniques make progress and the rest of the board must be searched
+    "search": 25,
+}
+
+# The level given to a board, based on the hardest technique needed to solve it
+LEVELS = {
+    "naked_single": "easy",
+    "hidden_single": "easy",
+    "locked_candidates": "medium",
+    "naked_pair": "medium",
+    "hidden_pair": "medium",
+    "x_wing": "hard",
+    "search": "expert",
+}
+
+
+class RatingGrid(object):
+    """
+    Pencil mark grid used to rate a board, holding the value and remaining candidates of each tile.
+    Unlike the solver's masks, candidates can be eliminated from single tiles by the techniques.
+        Init parameters:
+            board (list) - 9 by 9 matrix containg numbers between 0 and 9, 0 for a blank tile.
+    """
+
+    def __init__(self, board: List[List[int]]):
+        self.values = [0] * 81
+        self.candidates = [ALL_CANDIDATES] * 81
+        for x in range(9):
+            for y in range(9):
+                if board[x][y]:
+                    self.place(x * 9 + y, board[x][y])
+
+    def place(self, index: int, value: int):
+        """Fill a tile, removing the value from the candidates of its peers."""
+        mask = ~(1 << (value - 1))
+        self.values[index] = value
+        self.candidates[index] = 0
+        for peer in PEERS[index]:
+            self.candidates[peer] &= mask
+
+    def eliminate(self, indexes: List[int], bits: int) -> bool:
+        """Remove the candidate bits from the given tiles, returns True if any were removed."""
+        changed = False
+        for index in indexes:
+            if self.candidates[index] & bits:
+                self.candidates[index] &= ~bits
+                changed = True
+        return changed
+
+    def solved(self) -> bool:
+        """Returns True once every tile is filled."""
+        return 0 not in self.values
+
+    # Techniques, each makes a single step of progress (filling tiles or removing candidates) and returns True, or returns False if it can't be used
+
+    def naked_single(self) -> bool:
+        """Fill every tile which has a single candidate."""
+        progress = False
+        for index in range(81):
+            candidates = self.candidates[index]
+            if self.values[index] == 0 and candidates and candidates & (candidates - 1) == 0:
+                self.place(index, BIT_VALUE[candidates])
+                progress = True
+        return progress
+
+    def hidden_single(self) -> bool:
+        """Fill a tile which is the only place in a unit for one of its candidates."""
+        for unit in UNITS:
+            seen_once, seen_more = 0, 0
+            for index in unit:
+                seen_more |= seen_once & self.candidates[index]
+                seen_once |= self.candidates[index]
+            singles = seen_once & ~seen_more
+            if singles:
+                bit = singles & -singles
+                for index in unit:
+                    if self.candidates[index] & bit:
+                        self.place(index, BIT_VALUE[bit])
+                        return True
+        return False
+
+    def locked_candidates(self) -> bool:
+        """
+        If a number's candidates in a box all lie on one line, remove it from the rest of the line (pointing).
+        If a number's candidates on a line all lie in one box, remove it from the rest of the box (claiming).
+        """
+        for bit in BIT_VALUE:
+            for box in BOX_UNITS:
+                tiles = [index for index in box if self.candidates[index] & bit]
+                if len(tiles) > 1:
+                    for line_of, lines in ((ROW_OF, ROW_UNITS), (COL_OF, COL_UNITS)):
+                        if all(line_of[index] == line_of[tiles[0]] for index in tiles):
+                            others = [index for index in lines[line_of[tiles[0]]]
+                                      if index not in box]
+                            if self.eliminate(others, bit):
+                                return True
+            for line in ROW_UNITS + COL_UNITS:
+                tiles = [index for index in line if self.candidates[index] & bit]
+                if len(tiles) > 1 and all(BOX_OF[index] == BOX_OF[tiles[0]] for index in tiles):
+                    others = [index for index in BOX_UNITS[BOX_OF[tiles[0]]]
+                              if index not in line]
+                    if self.eliminate(others, bit):
+                        return True
+        return False
+
+    def naked_pair(self) -> bool:
+        """If two tiles in a unit have the same two candidates, remove them from the rest of the unit."""
+        for unit in UNITS:
+            pairs = {}
+            for index in unit:
+                candidates = self.candidates[index]
+                if bin(candidates).count("1") == 2:
+                    if candidates in pairs:
+                        others = [other for other in unit if other not in (index, pairs[candidates])]
+                        if self.eliminate(others, candidates):
+                            return True
+                    else:
+                        pairs[candidates] = index
+        return False
+
+    def hidden_pair(self) -> bool:
+        """If two numbers can only go in the same two tiles of a unit, remove the other candidates from those tiles."""
+        for unit in UNITS:
+            places = {}
+            for bit in BIT_VALUE:
+                tiles = tuple(index for index in unit if self.candidates[index] & bit)
+                if len(tiles) == 2:
+                    if tiles in places:
+                        if self.eliminate(list(tiles), ALL_CANDIDATES & ~(bit | places[tiles])):
+                            return True
+                    else:
+                        places[tiles] = bit
+        return False
+
+    def x_wing(self) -> bool:
+        """
+        If a number can only go in the same two columns in two rows, remove it from the rest of those columns.
+        The same is checked with the rows and columns swapped.
+        """
+        for bit in BIT_VALUE:
+            for lines, line_of, cross_lines, cross_of in ((ROW_UNITS, ROW_OF, COL_UNITS, COL_OF), (COL_UNITS, COL_OF, ROW_UNITS, ROW_OF)):
+                seen = {}
+                for line_number, line in enumerate(lines):
+                    crosses = tuple(cross_of[index] for index in line
+                                    if self.candidates[index] & bit)
+                    if len(crosses) != 2:
+                        continue
+                    if crosses in seen:
+                        wing = (seen[crosses], line_number)
+                        others = [index for cross in crosses for index in cross_lines[cross]
+                                  if line_of[index] not in wing]
+                        if self.eliminate(others, bit):
+                            return True
+                    else:
+                        seen[crosses] = line_number
+        return False
+
+    def techniques(self) -> List[Tuple[str, Callable[[], bool]]]:
+        """Returns the (name, method) of each technique, easiest first."""
+        return [
+            ("naked_single", self.naked_single),
+            ("hidden_single", self.hidden_single),
+            ("locked_candidates", self.locked_candidates),
+            ("naked_pair", self.naked_pair),
+            ("hidden_pair", self.hidden_pair),
+            ("x_wing", self.x_wing),
+        ]
+
+
+def rate_board(board: List[List[int]]) -> dict:
+    """
+    Rate a board by solving it the way a person would, always using the easiest technique which makes progress.
+    Returns a dict containing:
+        level (str) - "easy", "medium", "hard" or "expert", based on the hardest technique needed.
+        hardest (str) - The name of the hardest technique needed, "search" if the techniques weren't enough to solve the board.
+        score (int) - The total of the TECHNIQUE_SCORES of every step taken, for ordering boards within a level.
+    """
+    grid = RatingGrid(board)
+    techniques = grid.techniques()
+    hardest, score = 0, 0
+    while not grid.solved():
+        for number, (name, technique) in enumerate(techniques):
+            if technique():
+                hardest = max(hardest, number)
+                score += TECHNIQUE_SCORES[name]
+                break
+        else:
+            # None of the techniques make progress, so the rest of the board needs trial and error
+            hardest = len(techniques)
+            score += TECHNIQUE_SCORES["search"]
+            break
+
+    name = list(TECHNIQUE_SCORES)[hardest]
+    return {"level": LEVELS[name], "hardest": name, "score": score}
@@ -0,0 +1,176 @@
+import random
+import time
+from typing import List, Optional, Tuple
+
+
+def shuffle_board(board: List[List[int]], rng: Optional[random.Random] = None) -> List[List[int]]:
+    """
+    Returns a copy of the board with its rows and columns mixed within each band and stack, then rotated a random multiple of 90 degrees.
+    The new board is still valid and has the same solutions (mixed the same way), so even if the same puzzle is loaded, it should look different.
+    The random numbers are taken from rng, or the random module if no rng is given.
+    """
+    rng = rng or random
+    board = [row[:] for row in board]
+
+    # Iterate over each band of 3 rows
+    for x in range(0, 9, 3):
+        # Iterate over the 3 rows in the band.
+        for row_num in range(x, x+3):
+            # Select a random row from the band and switch the rows
+            random_row = rng.randint(x, x+2)
+            board[row_num], board[random_row] = board[random_row], board[row_num]
+
+    # Iterate over each band of 3 columns
+    for y in range(0, 9, 3):
+        # Iterate over the 3 columns in the band.
+        for column_num in range(y, y+3):
+            # Select a random column from the band and switch the columns
+            random_column = rng.randint(y, y+2)
+            for row in board:
+                row[column_num], row[random_column] = row[random_column], row[column_num]
+
+    # Rotate the board by 90 degrees a random number of times
+    for _ in range(rng.randint(0, 3)):
+        board = [list(row) for row in zip(*board[::-1])]
+    return board
+
+
+class Session(object):
+    """
+    Headless state of a single game, holding the board, the tiles given by the puzzle, the active tile and the timer.
+    This has no dependency on pygame, so games can be simulated or served without a window (the pygame Game draws a Session).
+    Moves are validated in constant time using counts of each number in each row, column and box.
+    The same counts give the conflicting tiles and the candidates of each tile without scanning the board.
+    The number of filled tiles and repeated numbers are counted as tiles are set, so the end of the game is found without scanning the board either.
+        Init parameters:
+            board (list) - 9 by 9 matrix containg numbers between 0 and 9, 0 for a blank tile. The tiles filled in are locked.
+            allow_conflicts (bool) - If True, numbers can be placed where they break the rules (see .conflicts), otherwise those moves are rejected.
+        How to use:
+            Call .move_active to move the active tile, .set_active (or .set) to fill or clear a tile, and .check_win after each change to find when the board is complete.
+            Call .conflicts and .candidates to find the tiles which break the rules and the numbers which can go in a tile.
+            If the board is changed by anything else (such as a solver), call .recount afterwards.
+    """
+
+    __slots__ = ("board", "base_board", "active", "allow_conflicts", "row_counts", "col_counts",
+                 "box_counts", "filled", "repeats", "version", "start_time", "end_time", "complete")
+
+    def __init__(self, board: List[List[int]], allow_conflicts: Optional[bool] = False):
+        self.board = [row[:] for row in board]
+        self.base_board = [row[:] for row in board]
+        self.active = [0, 0]
+        self.allow_conflicts = allow_conflicts
+        # Increased whenever the board changes, so anything showing the board can tell when it is out of date
+        self.version = 0
+
+        # Count of each number (index x * 10 + number) in each row, column and box, the number of tiles filled and the number of repeats
+        self.row_counts = [0] * 90
+        self.col_counts = [0] * 90
+        self.box_counts = [0] * 90
+        self.filled = 0
+        self.repeats = 0
+        self.recount()
+
+        self.start_time = time.time()
+        self.end_time = None
+        self.complete = False
+
+    def recount(self):
+        """Recount the numbers on the board, this must be called if the board is changed without using .set."""
+        self.row_counts = [0] * 90
+        self.col_counts = [0] * 90
+        self.box_counts = [0] * 90
+        self.filled = 0
+        self.repeats = 0
+        self.version += 1
+        for x in range(9):
+            for y in range(9):
+                value = self.board[x][y]
+                if value:
+                    self.__count((x, y), value, 1)
+
+    def __count(self, pos: Tuple[int, int], value: int, change: int):
+        """Add change (1 or -1) to the counts of value in the row, column and box of the tile at pos."""
+        x, y = pos
+        for counts, index in ((self.row_counts, x * 10 + value), (self.col_counts, y * 10 + value),
+                              (self.box_counts, ((x // 3) * 3 + y // 3) * 10 + value)):
+            # Every number after the first in a unit is a repeat
+            if change > 0 and counts[index] > 0 or change < 0 and counts[index] > 1:
+                self.repeats += change
+            counts[index] += change
+        self.filled += change
+
+    def is_valid(self, pos: Tuple[int, int], value: int) -> bool:
+        """Returns True if the tile at pos can be set to value, 0 clears the tile."""
+        x, y = pos
+        # Check whether the specified tile is writable.
+        if self.base_board[x][y] != 0:
+            return False
+        if value == 0 or self.board[x][y] == value or self.allow_conflicts:
+            return True
+        # The number can't already be in the same row, column or box
+        return not (self.row_counts[x * 10 + value] or self.col_counts[y * 10 + value]
+                    or self.box_counts[((x // 3) * 3 + y // 3) * 10 + value])
+
+    def conflicts(self, pos: Tuple[int, int]) -> bool:
+        """Returns True if the number in the tile at pos is repeated in its row, column or box."""
+        x, y = pos
+        value = self.board[x][y]
+        return bool(value) and (self.row_counts[x * 10 + value] > 1 or self.col_counts[y * 10 + value] > 1
+                                or self.box_counts[((x // 3) * 3 + y // 3) * 10 + value] > 1)
+
+    def candidates(self, pos: Tuple[int, int]) -> List[int]:
+        """Returns the numbers which aren't used in the row, column or box of the tile at pos, or an empty list if the tile is filled."""
+        x, y = pos
+        if self.board[x][y]:
+            return []
+        row, col, box = x * 10, y * 10, ((x // 3) * 3 + y // 3) * 10
+        return [value for value in range(1, 10)
+                if not (self.row_counts[row + value] or self.col_counts[col + value] or self.box_counts[box + value])]
+
+    def set(self, pos: Tuple[int, int], value: int) -> bool:
+        """Set the tile at pos to value (0 clears the tile) if it passes .is_valid, returns True if the tile was set."""
+        if not self.is_valid(pos, value):
+            return False
+        x, y = pos
+        if self.board[x][y]:
+            self.__count(pos, self.board[x][y], -1)
+        self.board[x][y] = value
+        if value:
+            self.__count(pos, value, 1)
+        self.version += 1
+        return True
+
+    def set_active(self, value: int) -> bool:
+        """Set the active tile to value, see .set."""
+        return self.set(self.active, value)
+
+    def move_active(self, vector: Tuple[int, int], absolute: Optional[bool] = False):
+        """
+        Moves the active tile by the given vector when absolute is false.\n
+        Moves the active tile TO the given vector when absolute is true.
+        """
+        if absolute:
+            self.active = list(vector)
+        else:
+            new_active = [self.active[0] + vector[0],
+                          self.active[1] + vector[1]]
+            # If the current active tile is off the left or right of the screen, wrap back to the other side.
+            if new_active[0] == 9:
+                new_active = [0, new_active[1] + 1]
+            elif new_active[0] == -1:
+                new_active = [8, new_active[1] - 1]
+            # If the new_active is within the acceptable bounds, update the current active tile.
+            if 0 <= new_active[0] < 9 and 0 <= new_active[1] < 9:
+                self.active = new_active
+
+    def check_win(self) -> bool:
+        """Returns True the first time this is called after every tile has been filled without breaking the rules, stopping the timer."""
+        if self.complete or self.filled < 81 or self.repeats:
+            return False
+        self.complete = True
+        self.end_time = time.time()
+        return True
+
+    def elapsed(self) -> float:
+        """Returns the time taken so far in seconds, or the total time taken once complete."""
+        return (self.end_time or time.time()) - self.start_time
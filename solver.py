@@ -1,54 +1,625 @@
 import threading
-from typing import List, Optional, Callable, Tuple
+from typing import TYPE_CHECKING, List, Optional, Callable, Tuple, Iterator
 
+if TYPE_CHECKING:
+    import ctypes
 
-class Solver(threading.Thread):
+# Names of the solving engines which can be selected using the engine parameter of the Solver
+ENGINES = ("backtrack", "bitmask", "dlx")
+
+# Bitmask with all 9 candidate bits set, bit (n - 1) represents the number n
+ALL_CANDIDATES = 0x1FF
+
+# Lookup tables mapping each tile index (x * 9 + y) to its row, column and box number
+ROW_OF = [i // 9 for i in range(81)]
+COL_OF = [i % 9 for i in range(81)]
+BOX_OF = [(i // 27) * 3 + (i % 9) // 3 for i in range(81)]
+
+# The 27 units (rows, columns and boxes), each a list of the tile indexes within it
+UNITS = [[x * 9 + y for y in range(9)] for x in range(9)] + \
+    [[x * 9 + y for x in range(9)] for y in range(9)] + \
+    [[i for i in range(81) if BOX_OF[i] == box] for box in range(9)]
+
+# Lookup from a single candidate bit to the number it represents
+BIT_VALUE = {1 << n: n + 1 for n in range(9)}
+
+
+class CandidateBoard(object):
     """
-    Class for solving a sudoku board (sub class of threading.Thread)
+    Flat copy of a board, along with bitmasks of the numbers used in each row, column and box.
+    The masks are updated incrementally as tiles are filled and cleared, and every change is written through to the 9 by 9 board.
+        Init parameters:
+            board (list) - 9 by 9 matrix containg numbers between 0 and 9, 0 for a blank tile.
+    """
+
+    def __init__(self, board: List[List[int]]):
+        self.board = board
+        self.cells = [0] * 81
+        self.rows = [0] * 9
+        self.cols = [0] * 9
+        self.boxes = [0] * 9
+
+        # Set to False if the given board breaks the rules (a number appears twice in a unit)
+        self.consistent = True
+        for x in range(9):
+            for y in range(9):
+                value = board[x][y]
+                if value:
+                    bit = 1 << (value - 1)
+                    if (self.rows[x] | self.cols[y] | self.boxes[BOX_OF[x * 9 + y]]) & bit:
+                        self.consistent = False
+                    self.place(x * 9 + y, value)
+
+    def candidates(self, index: int) -> int:
+        """Returns the bitmask of the numbers which can be placed in the tile with the given index."""
+        return ALL_CANDIDATES & ~(self.rows[ROW_OF[index]] | self.cols[COL_OF[index]] | self.boxes[BOX_OF[index]])
+
+    def place(self, index: int, value: int):
+        """Place a value in the tile with the given index, updating the masks."""
+        bit = 1 << (value - 1)
+        x, y = ROW_OF[index], COL_OF[index]
+        self.cells[index] = value
+        self.board[x][y] = value
+        self.rows[x] |= bit
+        self.cols[y] |= bit
+        self.boxes[BOX_OF[index]] |= bit
+
+    def clear(self, index: int):
+        """Clear the tile with the given index, updating the masks."""
+        mask = ~(1 << (self.cells[index] - 1))
+        x, y = ROW_OF[index], COL_OF[index]
+        self.cells[index] = 0
+        self.board[x][y] = 0
+        self.rows[x] &= mask
+        self.cols[y] &= mask
+        self.boxes[BOX_OF[index]] &= mask
+
+
+class BacktrackEngine(CandidateBoard):
+    """
+    Backtracking solving engine, used by the Solver when engine="backtrack".
+    Empty tiles are filled in row major order trying 1 to 9 in each, so the solutions are always found in the same order.
+        Init parameters:
+            board (list) - 9 by 9 matrix containg numbers between 0 and 9, 0 for a blank tile. This list is filled in as the engine runs.
+    """
+
+    def steps(self) -> Iterator[Optional[List[int]]]:
+        """
+        Generator which runs the search one step at a time using an explicit stack.
+        The position of each tile filled is yielded after it is filled, None is yielded whenever the board holds a solution.
+        If the generator is not exhausted, the board is left as it was at the last step.
+        """
+        if not self.consistent:
+            return
+
+        cells = self.cells
+        empty = [index for index in range(81) if cells[index] == 0]
+        # The lowest number still to be tried at each depth of the search
+        next_value = [1] * (len(empty) + 1)
+        depth = 0
+        while depth >= 0:
+            if depth == len(empty):
+                yield None
+                depth -= 1
+                continue
+
+            index = empty[depth]
+            if cells[index]:
+                self.clear(index)
+            # Shift off the numbers which have already been tried
+            candidates = self.candidates(index) >> (next_value[depth] - 1)
+            if candidates:
+                value = next_value[depth] + BIT_VALUE[candidates & -candidates] - 1
+                self.place(index, value)
+                next_value[depth] = value + 1
+                yield [ROW_OF[index], COL_OF[index]]
+                depth += 1
+                next_value[depth] = 1
+            else:
+                # None of the numbers are valid, return to the previous tile
+                depth -= 1
+
+
+class BitmaskEngine(CandidateBoard):
+    """
+    Constraint propagation solving engine, used by the Solver when engine="bitmask".
+    Each step fills in all naked and hidden singles, then branches on the tile with the fewest candidates.
+        Init parameters:
+            board (list) - 9 by 9 matrix containg numbers between 0 and 9, 0 for a blank tile. This list is filled in as the engine runs.
+    """
+
+    def propagate(self, trail: List[int]) -> bool:
+        """
+        Fill in naked singles (tiles with one candidate) and hidden singles (numbers with one possible tile in a unit) until none remain.
+        The index of each filled tile is appended to the trail so they can be cleared when backtracking.
+        Returns False if a contradiction is found.
+        """
+        cells = self.cells
+        progress = True
+        while progress:
+            progress = False
+
+            # Naked singles
+            for index in range(81):
+                if cells[index] == 0:
+                    candidates = self.candidates(index)
+                    if candidates == 0:
+                        return False
+                    if candidates & (candidates - 1) == 0:
+                        self.place(index, BIT_VALUE[candidates])
+                        trail.append(index)
+                        progress = True
+            if progress:
+                continue
+
+            # Hidden singles
+            for unit in UNITS:
+                seen_once, seen_more, used = 0, 0, 0
+                for index in unit:
+                    if cells[index]:
+                        used |= 1 << (cells[index] - 1)
+                    else:
+                        candidates = self.candidates(index)
+                        seen_more |= seen_once & candidates
+                        seen_once |= candidates
+                # If a number has nowhere to go in this unit, the board cannot be solved
+                if (seen_once | used) != ALL_CANDIDATES:
+                    return False
+                singles = seen_once & ~seen_more
+                if singles:
+                    bit = singles & -singles
+                    for index in unit:
+                        if cells[index] == 0 and self.candidates(index) & bit:
+                            self.place(index, BIT_VALUE[bit])
+                            trail.append(index)
+                            break
+                    # The masks have changed, so start the checks again
+                    progress = True
+                    break
+        return True
+
+    def choose(self) -> Tuple[int, int]:
+        """
+        Find the empty tile with the fewest candidates (minimum remaining values).
+        Returns the tile index and its candidates, the index is -1 if the board is full.
+        """
+        best, best_count, best_candidates = -1, 10, 0
+        for index in range(81):
+            if self.cells[index] == 0:
+                candidates = self.candidates(index)
+                count = bin(candidates).count("1")
+                if count < best_count:
+                    best, best_count, best_candidates = index, count, candidates
+                    if count == 2:
+                        break
+        return best, best_candidates
+
+    def steps(self) -> Iterator[Optional[List[int]]]:
+        """
+        Generator which runs the search one step at a time using an explicit stack.
+        The position of each branching tile is yielded after it is filled, None is yielded whenever the board holds a solution.
+        If the generator is not exhausted, the board is left as it was at the last step.
+        """
+        if not self.consistent:
+            return
+
+        # Each stack frame holds the tiles filled by propagation, the branching tile and its untried candidates
+        stack = []
+        trail = []
+        valid = self.propagate(trail)
+        while True:
+            if valid:
+                index, candidates = self.choose()
+                if index == -1:
+                    yield None
+                else:
+                    stack.append([trail, index, candidates])
+                    trail = None
+            # Clear the tiles filled since the last branch, unless they now belong to a stack frame
+            if trail is not None:
+                for filled in trail:
+                    self.clear(filled)
+
+            # Drop the frames which have no candidates left to try
+            while stack and stack[-1][2] == 0:
+                frame = stack.pop()
+                self.clear(frame[1])
+                for filled in frame[0]:
+                    self.clear(filled)
+            if not stack:
+                return
+
+            # Try the next candidate of the top frame
+            frame = stack[-1]
+            index = frame[1]
+            if self.cells[index]:
+                self.clear(index)
+            bit = frame[2] & -frame[2]
+            frame[2] ^= bit
+            self.place(index, BIT_VALUE[bit])
+            yield [ROW_OF[index], COL_OF[index]]
+            trail = []
+            valid = self.propagate(trail)
+
+
+class RemovalChecker(BitmaskEngine):
+    """
+    Incremental uniqueness checker, used by the generator to remove clues from a board one at a time.
+    The candidate masks are kept between removals, and only solutions which differ from the known solution at the removed tile are searched for.
+    Any other solution would also have been a solution of the board before the removal, so this is enough to show the solution is still unique.
+        Init parameters:
+            board (list) - 9 by 9 matrix containg numbers between 0 and 9, which must have a unique solution (a completed board for example). Removed clues are cleared from this list.
+    """
+
+    def remove(self, position: Tuple[int, int]) -> bool:
+        """
+        Remove the clue at the given position, as long as the board still has a unique solution afterwards.
+        Returns True if the clue was removed, or False if it had to be put back.
+        """
+        index = position[0] * 9 + position[1]
+        value = self.cells[index]
+        if value == 0:
+            return True
+
+        self.clear(index)
+        alternatives = self.candidates(index) & ~(1 << (value - 1))
+        if alternatives:
+            empty = [i for i in range(81) if self.cells[i] == 0]
+            while alternatives:
+                bit = alternatives & -alternatives
+                alternatives ^= bit
+                self.place(index, BIT_VALUE[bit])
+                if None in self.steps():
+                    # Another solution exists, clear the tiles filled by the search and put the clue back
+                    for i in empty:
+                        if self.cells[i]:
+                            self.clear(i)
+                    self.place(index, value)
+                    return False
+                # The search was exhausted, so only the alternative itself needs clearing
+                self.clear(index)
+        return True
+
+
+# The Dancing Links matrix is only built once per process, when the first DLXEngine is created
+_dlx_matrix = None
+
+
+def _build_dlx_matrix() -> Tuple[List[int], ...]:
+    """
+    Build the exact cover matrix for a blank board as Dancing Links arrays.
+    There are 324 constraint columns (81 tiles, and 81 row, column and box number constraints) and 729 matrix rows (one per tile and number).
+    Node 0 is the root, nodes 1 to 324 are the column headers and the 4 nodes for matrix row r start at 325 + 4 * r.
+    Returns the (left, right, up, down, column, size) lists.
+    """
+    node_count = 325 + 729 * 4
+    left = [0] * node_count
+    right = [0] * node_count
+    up = list(range(node_count))
+    down = list(range(node_count))
+    column = list(range(node_count))
+    size = [0] * 325
+
+    # Link the root and column headers into a circular list
+    for node in range(325):
+        left[node] = node - 1 if node > 0 else 324
+        right[node] = node + 1 if node < 324 else 0
+
+    for index in range(81):
+        for number in range(9):
+            first = 325 + (index * 9 + number) * 4
+            columns = (1 + index,
+                       82 + ROW_OF[index] * 9 + number,
+                       163 + COL_OF[index] * 9 + number,
+                       244 + BOX_OF[index] * 9 + number)
+            for offset in range(4):
+                node = first + offset
+                header = columns[offset]
+                # Link the node into the bottom of its column
+                column[node] = header
+                up[node] = up[header]
+                down[node] = header
+                down[up[header]] = node
+                up[header] = node
+                size[header] += 1
+                # Link the node into the circular list of its matrix row
+                left[node] = first + (offset - 1) % 4
+                right[node] = first + (offset + 1) % 4
+    return left, right, up, down, column, size
+
+
+class DLXEngine(object):
+    """
+    Dancing Links (Algorithm X) exact cover solving engine, used by the Solver when engine="dlx".
+    The constraint matrix is built once per process and copied for each engine, so creating an engine is cheap.
+        Init parameters:
+            board (list) - 9 by 9 matrix containg numbers between 0 and 9, 0 for a blank tile. This list is filled in as the engine runs.
+    """
+
+    def __init__(self, board: List[List[int]]):
+        global _dlx_matrix
+        if _dlx_matrix is None:
+            _dlx_matrix = _build_dlx_matrix()
+
+        self.board = board
+        self.__left, self.__right, self.__up, self.__down, self.__column, self.__size = [
+            array[:] for array in _dlx_matrix]
+
+        # Select the matrix rows for the numbers already on the board
+        self.consistent = True
+        covered = set()
+        for x in range(9):
+            for y in range(9):
+                if board[x][y]:
+                    first = 325 + ((x * 9 + y) * 9 + board[x][y] - 1) * 4
+                    headers = [self.__column[first + offset]
+                               for offset in range(4)]
+                    # If any of the constraints are already satisfied, the board breaks the rules
+                    if covered.intersection(headers):
+                        self.consistent = False
+                        return
+                    covered.update(headers)
+                    for header in headers:
+                        self.__cover(header)
+
+    def __cover(self, header: int):
+        """Remove a column from the header list, along with every matrix row which satisfies it."""
+        left, right, up, down, column, size = self.__left, self.__right, self.__up, self.__down, self.__column, self.__size
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def __uncover(self, header: int):
+        """Reverse a call to __cover."""
+        left, right, up, down, column, size = self.__left, self.__right, self.__up, self.__down, self.__column, self.__size
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def steps(self) -> Iterator[Optional[List[int]]]:
+        """
+        Generator which runs Algorithm X one step at a time using an explicit stack.
+        The position of each tile filled is yielded after it is filled, None is yielded whenever the board holds a solution.
+        If the generator is not exhausted, the board is left as it was at the last step.
+        """
+        if not self.consistent:
+            return
+
+        left, right, down, column, size = self.__left, self.__right, self.__down, self.__column, self.__size
+        # Each stack frame holds the covered column and the matrix row currently selected from it
+        stack = []
+        while True:
+            if right[0] == 0:
+                # Every column has been covered, so the board is solved
+                yield None
+            else:
+                # Choose the column with the fewest remaining rows
+                header = right[0]
+                best = header
+                while header != 0:
+                    if size[header] < size[best]:
+                        best = header
+                        if size[best] < 2:
+                            break
+                    header = right[header]
+                if size[best] > 0:
+                    self.__cover(best)
+                    stack.append([best, best])
+
+            # Move the top frame on to its next row, dropping any frames which have run out of rows
+            while stack:
+                frame = stack[-1]
+                best, row = frame
+                if row != best:
+                    # Deselect the previous row
+                    j = left[row]
+                    while j != row:
+                        self.__uncover(column[j])
+                        j = left[j]
+                    index = (row - 325) // 36
+                    self.board[ROW_OF[index]][COL_OF[index]] = 0
+
+                row = down[row]
+                frame[1] = row
+                if row != best:
+                    # Decode the tile and number from the node's position in the matrix
+                    index, number = divmod((row - 325) // 4, 9)
+                    self.board[ROW_OF[index]][COL_OF[index]] = number + 1
+                    j = right[row]
+                    while j != row:
+                        self.__cover(column[j])
+                        j = right[j]
+                    yield [ROW_OF[index], COL_OF[index]]
+                    break
+
+                self.__uncover(best)
+                stack.pop()
+            else:
+                return
+
+
+# Mapping of the engine names to the engine classes
+ENGINE_CLASSES = {
+    "backtrack": BacktrackEngine,
+    "bitmask": BitmaskEngine,
+    "dlx": DLXEngine,
+}
+
+
+class SolverCore(object):
+    """
+    Class for solving a sudoku board without any thread state, used directly for batch work and wrapped by Solver for the GUI.
         Init parameters:
             board (list) - 9 by 9 matrix containg numbers between 0 and 9, 0 for a blank tile.
             separate (bool) - Optional bool, controls whether the given board is copied or linked to the passed list.
-            update_function (callable) - Optional callable, is called once per loop of the solver, the update function must take the current position and board (in that order) as arguments.
+            update_function (callable) - Optional callable, is called once per step of the solver, the update function must take the current position and board (in that order) as arguments.
             no_of_solutions (int) - Optional int, defines the number of solutions for the solver to generate, defaults to 1. The solver will terminate when it reaches this number.
+            engine (str) - Optional str, the solving engine to use (one of ENGINES), defaults to "backtrack".
+                "backtrack" tries 1 to 9 in each tile in order, so the first solution found is always the same.
+                "bitmask" uses constraint propagation and is much faster on hard boards, but may find the solutions in a different order.
+                "dlx" uses Dancing Links (Algorithm X), it is mainly useful for counting solutions and cross-checking the other engines.
+        How to use:
+            Call .solve and read the results from the .solutions list.
+            Alternatively iterate over .iter_solutions or .iter_steps to run the search lazily, one solution or step at a time.
     """
 
-    def __init__(self, board: List[List[int]], separate: Optional[bool] = True, update_function: Optional[Callable] = None, no_of_solutions: Optional[int] = 1):
+    __slots__ = ("board", "solutions", "update_function",
+                 "no_of_solutions", "engine", "stopped")
 
-        # Initalise the Thread
-        super().__init__(name="Solver")
+    def __init__(self, board: List[List[int]], separate: Optional[bool] = True, update_function: Optional[Callable] = None, no_of_solutions: Optional[int] = 1, engine: Optional[str] = "backtrack"):
+
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown solving engine '{engine}', must be one of {ENGINES}")
 
         # If the boards are supposed to be separated from the passed lists, create copies of them
         if separate:
-            self.__board = []
-            for row in board:
-                self.__board.append(row[:])
+            self.board = [row[:] for row in board]
         else:
-            self.__board = board
-        self.__baseBoard = []
-        for row in self.__board:
-            self.__baseBoard.append(row[:])
+            self.board = board
 
         # List to store solutions
         self.solutions = []
 
-        # Store the update function, this is called for each recursive step in the backtracking algorithm
-        self.__update_function = update_function
+        # Store the update function, this is called for each step of the search
+        self.update_function = update_function
 
         # Store the requested number of solutions
         self.no_of_solutions = no_of_solutions
 
+        # Store the name of the solving engine
+        self.engine = engine
+
+        # Setting stopped to True ends the search at its next step
+        self.stopped = False
+
+    def iter_steps(self) -> Iterator[Optional[List[int]]]:
+        """
+        Generator which runs the search one step at a time.
+        Yields the position of the tile changed by each step, or None when the board holds a solution.
+        The search ends without yielding anything further once stopped is set.
+        """
+        board = self.board
+        update_function = self.update_function
+        for position in ENGINE_CLASSES[self.engine](board).steps():
+            if self.stopped:
+                return
+            if position is not None and update_function is not None:
+                update_function(position, board)
+            yield position
+
+    def iter_solutions(self) -> Iterator[List[List[int]]]:
+        """
+        Generator which yields a copy of each solution as it is found.
+        No work is done beyond the last solution taken, so the caller can stop after any number of solutions.
+        """
+        for position in self.iter_steps():
+            if position is None:
+                yield [row[:] for row in self.board]
+
+    def solve(self):
+        """Begins the solving process, no_of_solutions is the number of solutions found before the solver stops."""
+        if len(self.solutions) >= self.no_of_solutions:
+            return
+        for solution in self.iter_solutions():
+            self.solutions.append(solution)
+            if len(self.solutions) >= self.no_of_solutions:
+                break
+
+    def stop(self):
+        """Abort the solver"""
+        self.stopped = True
+
+
+class SolverProgress(object):
+    """
+    Single slot channel used to follow a solver's progress from another thread, such as the game's draw loop.
+    Each step replaces the slot, without taking any locks, so the solver is never held up by its readers.
+    Readers sample the slot whenever they want the latest step, and the steps in between are never seen.
+        How to use:
+            Pass .publish as the update_function of a solver, then read .latest from any thread.
+            .latest holds the position of the last tile changed (None before the first step) and the number of steps taken.
+    """
+
+    __slots__ = ("latest",)
+
+    def __init__(self):
+        # Replaced as a whole, so a reader never sees the position of one step with the count of another
+        self.latest = (None, 0)
+
+    def publish(self, position: List[int], board: List[List[int]]):
+        """Update function for the solver, records the step in the slot."""
+        self.latest = (position, self.latest[1] + 1)
+
+
+class Solver(threading.Thread):
+    """
+    Class for solving a sudoku board (sub class of threading.Thread), this is a thread wrapper around SolverCore.
+        Init parameters:
+            The init parameters are the same as SolverCore.
+        How to use:
+            Call .start to run the solver on a separate thread (or .solve to run it on this one) and read the results from the .solutions list.
+            The thread can be paused, resumed and stopped while it runs.
+    """
+
+    def __init__(self, board: List[List[int]], separate: Optional[bool] = True, update_function: Optional[Callable] = None, no_of_solutions: Optional[int] = 1, engine: Optional[str] = "backtrack"):
+
+        # Create the core first, so that an unknown engine is reported before the thread is set up
+        self.core = SolverCore(board, separate, self.__step,
+                               no_of_solutions, engine)
+
+        # Initalise the Thread
+        super().__init__(name="Solver")
+
+        # Store the update function, this is called for each step of the search
+        self.__update_function = update_function
+
         # Stop event allows this thread to be stopped before it finishes if required
         self.stop_event = threading.Event()
 
-    def __is_valid(self, pos: Tuple[int, int], value: int):
-        """Validates the current board setup."""
-        for x in range(9):
-            for y in range(9):
-                # If the tile being checked is in a position where it needs to be checked, and isnt the same as pos
-                if (x // 3 == pos[0] // 3 and y // 3 == pos[1] // 3) or (x == pos[0] or y == pos[1]) and ([x, y] != pos):
-                    if self.__board[x][y] == value:
-                        return False
-        return True
+        # Resume event is cleared while the solver is paused
+        self.resume_event = threading.Event()
+        self.resume_event.set()
+
+    @property
+    def solutions(self) -> List[List[List[int]]]:
+        """The solutions found so far."""
+        return self.core.solutions
+
+    @property
+    def no_of_solutions(self) -> int:
+        """The number of solutions to find before the solver stops."""
+        return self.core.no_of_solutions
+
+    @no_of_solutions.setter
+    def no_of_solutions(self, value: int):
+        self.core.no_of_solutions = value
+
+    @property
+    def engine(self) -> str:
+        """The name of the solving engine."""
+        return self.core.engine
+
+    def __step(self, position: Tuple[int, int], board: List[List[int]]):
+        """Called by the core for each step, waits here while the solver is paused."""
+        if not self.resume_event.is_set():
+            self.resume_event.wait()
+        self.update(position, board)
 
     def update(self, position: Tuple[int, int], board: List[List[int]]):
         """
@@ -58,60 +629,127 @@ class Solver(threading.Thread):
         if self.__update_function != None:
             self.__update_function(position, board)
 
-    def solve(self):
-        """Begins the solving process, no_of_solutions is the number of solutions found before the solver stops."""
-        # This is split off into another function in order to allow the aborting of this
-        try:
-            self.__solve(self.no_of_solutions)
-        except RuntimeError:
-            pass
-
-    def __solve(self, no_of_solutions: Optional[int] = 1, start_pos: Optional[Tuple[int, int]] = [0, 0]):
-        """
-        Backtracking algorithm for solving the sudoku board passed when initialised\n
-        Once function is complete, the results can be found in the solver.solutions list\n
-        no_of_solutions can be set to restrict the number of solutions to be found by the algorithm.
-        """
-
-        # If the stop even it not present, proceed with the next step
-        if not self.stop_event.is_set():
+    def iter_steps(self) -> Iterator[Optional[List[int]]]:
+        """See SolverCore.iter_steps"""
+        return self.core.iter_steps()
 
-            self.update(start_pos, self.__board)
+    def iter_solutions(self) -> Iterator[List[List[int]]]:
+        """See SolverCore.iter_solutions"""
+        return self.core.iter_solutions()
 
-            # Iterate over the coords in the board.
-            for x in range(start_pos[0], len(self.__board)):
+    def solve(self):
+        """Begins the solving process, no_of_solutions is the number of solutions found before the solver stops."""
+        self.core.solve()
 
-                # Reset start_pos x to 0 to prevent any missed tiles.
-                start_pos[0] = 0
-                for y in range(start_pos[1], len(self.__board)):
-                    start_pos[1] = 0
-                    if self.__baseBoard[x][y] == 0 and self.__board[x][y] == 0:
+    def pause(self):
+        """Pause the solver, it will wait at its next step until resumed"""
+        self.resume_event.clear()
 
-                        # Iterate of the numbers which could be inserted, when a valid one is found, insert it and call this function recursively.
-                        for num in range(1, 10):
-                            if self.__is_valid([x, y], num):
-                                self.__board[x][y] = num
-                                self.__solve(no_of_solutions, [x, y])
-                                self.__board[x][y] = self.__baseBoard[x][y]
-
-                        # If none of the above numbers have been valid, return back to the previous step.
-                        return
-            solution = []
-            for row in self.__board:
-                solution.append(row.copy())
-            self.solutions.append(solution)
-            if len(self.solutions) >= no_of_solutions:
-                # An exception is raised to break out of the recurrsion.
-                raise RuntimeError("Max solutions reached... Aborting...")
-
-        # If the stop_event is set, then raise an exception to abort the execution
-        else:
-            raise RuntimeError("Thread aborted")
+    def resume(self):
+        """Resume the solver after it has been paused"""
+        self.resume_event.set()
 
     def stop(self):
         """Abort the solver"""
         self.stop_event.set()
+        self.core.stop()
+        # Wake the solver if it is paused, so that it can finish
+        self.resume_event.set()
 
     def run(self):
         """Start the solver"""
         self.solve()
+
+
+def _solve_shared(values: "ctypes.Array[ctypes.c_byte]", progress: "ctypes.Array[ctypes.c_longlong]", solved: "ctypes.c_byte", report_steps: bool, engine: str):
+    """
+    Target of the SolverProcess child process, solves the shared board in place.
+    Each step writes the position and step count to progress, and solved is set to 1 or -1 once the search ends with or without a solution.
+    """
+    view = memoryview(values).cast("B")
+    # Each row is a view of the shared buffer, so every tile the search fills in is seen by the parent straight away
+    board = [view[x * 9:x * 9 + 9] for x in range(9)]
+
+    def publish(position: List[int], board: List[List[int]]):
+        progress[0], progress[1] = position
+        progress[2] += 1
+
+    core = SolverCore(board, False, publish if report_steps else None,
+                      engine=engine)
+    core.solve()
+    solved.value = 1 if core.solutions else -1
+
+
+class SolverProcess(object):
+    """
+    Runs a search in a child process, so that a long search doesn't compete with the calling process (such as the game's draw loop) for the GIL.
+    The board is shared with the child as an 81 byte buffer which the search fills in as it runs, the position and count of its steps are shared the same way.
+    Nothing is locked, so the parent may see a step part way through being written, it sees the next step on its following read.
+        Init parameters:
+            board (list) - 9 by 9 matrix containg numbers between 0 and 9, 0 for a blank tile. This is only updated when .sync is called.
+            report_steps (bool) - If False, the child doesn't share the position of each step, so the search runs faster.
+            engine (str) - The name of the solving engine, one of ENGINES.
+        How to use:
+            Call .start to begin the search and .sync to copy the shared board into board.
+            .latest holds the position of the last step and the number of steps taken (see SolverProgress).
+            Call .stop to end the search immediately.
+    """
+
+    def __init__(self, board: List[List[int]], report_steps: Optional[bool] = True, engine: Optional[str] = "backtrack"):
+        if engine not in ENGINE_CLASSES:
+            raise ValueError(f"Unknown solving engine '{engine}', must be one of {ENGINES}")
+        self.board = board
+        self.engine = engine
+
+        # multiprocessing is imported here rather than with the module, so importing the solver (and the game) stays cheap
+        import multiprocessing
+        from multiprocessing.sharedctypes import RawArray, RawValue
+
+        self.__values = RawArray("b", [value for row in board for value in row])
+        self.__progress = RawArray("q", [-1, -1, 0])
+        self.__solved = RawValue("b", 0)
+        # The child is spawned rather than forked, so that it doesn't inherit the state (such as signal handlers) of libraries like pygame
+        self.__process = multiprocessing.get_context("spawn").Process(
+            target=_solve_shared, name="Solver", daemon=True,
+            args=(self.__values, self.__progress, self.__solved, report_steps, engine))
+        # Set once the board has been copied after the child finished, as it won't change again
+        self.__synced = False
+
+    @property
+    def latest(self) -> Tuple[Optional[List[int]], int]:
+        """The position of the last step (None before the first step) and the number of steps taken."""
+        x, y, steps = self.__progress
+        return (None if x < 0 else [x, y]), steps
+
+    @property
+    def solved(self) -> Optional[bool]:
+        """True if a solution was found, False if the board has no solution, or None if the search hasn't finished."""
+        return None if self.__solved.value == 0 else self.__solved.value > 0
+
+    def sync(self):
+        """Copy the shared board into board, this does nothing once the final board has been copied."""
+        if self.__synced:
+            return
+        finished = self.__solved.value != 0
+        values = self.__values[:]
+        for x in range(9):
+            self.board[x][:] = values[x * 9:x * 9 + 9]
+        self.__synced = finished
+
+    def start(self):
+        """Start the child process."""
+        self.__process.start()
+
+    def is_alive(self) -> bool:
+        """Returns True while the child process is running."""
+        return self.__process.is_alive()
+
+    def join(self, timeout: Optional[float] = None):
+        """Wait for the child process to finish."""
+        self.__process.join(timeout)
+
+    def stop(self):
+        """End the search immediately by terminating the child process."""
+        if self.__process.is_alive():
+            self.__process.terminate()
+            self.__process.join()
@@ -0,0 +1,339 @@
+import array
+import hashlib
+import json
+import mmap
+import os
+import random
+import shutil
+import struct
+import tempfile
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+# Keys stored alongside the boards of a record which aren't boards themselves
+METADATA_KEYS = ("rating", "canonical")
+
+# The difficulty boards of each rated level (see rating.LEVELS) are played as, there is no expert game so expert boards are played as hard
+LEVEL_DIFFICULTIES = {"easy": "easy", "medium": "medium", "hard": "hard", "expert": "hard"}
+
+
+def encode_board(board: List[List[int]]) -> str:
+    """Encode a 9 by 9 board as an 81 character string of digits (row by row, 0 for a blank tile)."""
+    return "".join([str(value) for row in board for value in row])
+
+
+def decode_board(text: str) -> List[List[int]]:
+    """Decode an 81 character string created by encode_board back into a 9 by 9 board."""
+    if len(text) != 81:
+        raise ValueError(f"Encoded boards must be 81 characters long, not {len(text)}")
+    return [list(map(int, text[i:i + 9])) for i in range(0, 81, 9)]
+
+
+def board_items(boards: dict) -> Iterator[Tuple[str, str]]:
+    """Generator which yields the (difficulty, board) pairs of a record's boards, skipping the METADATA_KEYS."""
+    for difficulty, board in boards.items():
+        if difficulty not in METADATA_KEYS:
+            yield difficulty, board
+
+
+def form_hash(form: str) -> int:
+    """Returns a 64 bit hash of a canonical form (see canonical.canonical_form), used to look up forms in a PuzzleIndex."""
+    return int.from_bytes(hashlib.blake2b(form.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def rated_items(boards: dict) -> Iterator[Tuple[str, str]]:
+    """
+    Generator which yields the (difficulty, board) pairs of a record's boards like board_items, but with the difficulty each board is played as (see LEVEL_DIFFICULTIES).
+    Boards of records stored without a rating keep the difficulty they were generated for.
+    """
+    ratings = boards.get("rating", {})
+    for difficulty, board in board_items(boards):
+        if difficulty in ratings:
+            difficulty = LEVEL_DIFFICULTIES.get(ratings[difficulty]["level"], difficulty)
+        yield difficulty, board
+
+
+def pack_board(text: str) -> bytes:
+    """Pack an encoded board string into 41 bytes, two tiles per byte."""
+    if len(text) != 81:
+        raise ValueError(f"Encoded boards must be 81 characters long, not {len(text)}")
+    # Each digit is a single nibble, so the string can be read as hex once padded to an even length
+    return bytes.fromhex(text + "0")
+
+
+def unpack_board(data: bytes) -> str:
+    """Unpack 41 bytes created by pack_board back into an encoded board string."""
+    return data.hex()[:81]
+
+
+class PuzzleLog(object):
+    """
+    Append-only puzzle store, each line of the file is a JSON record holding a seed and its boards (one for each difficulty).
+    Records may also hold the rating of each board (see rating.rate_board) under the "rating" key, and the canonical form of the puzzle (see canonical.canonical_form) under the "canonical" key.
+    Boards are held as 81 character strings (see encode_board), boards stored as nested lists by older versions are encoded as they are read.
+    New puzzles are appended to the end of the file, so storing N puzzles only writes those N records.
+        Init parameters:
+            path (str) - The location of the log file.
+            legacy_path (str) - Optional location of an old style JSON puzzle file, its puzzles are read before those in the log and it is merged into the log when compacted.
+        How to use:
+            Call .load to read all of the puzzles, .append to add new puzzles and .compact to rewrite the log without duplicate or damaged records.
+    """
+
+    def __init__(self, path: str, legacy_path: Optional[str] = None):
+        self.path = path
+        self.legacy_path = legacy_path
+
+        # Number of damaged records skipped by the last read, these are left behind if a write is interrupted
+        self.skipped = 0
+
+    def records(self) -> Iterator[Tuple[str, dict]]:
+        """
+        Generator which streams the (seed, boards) records from the store, starting with the legacy file.
+        Records which can't be read are skipped and counted in .skipped.
+        """
+        self.skipped = 0
+        if self.legacy_path is not None and os.path.exists(self.legacy_path):
+            with open(self.legacy_path, "r") as file:
+                for seed, boards in json.load(file).items():
+                    yield seed, self.__encode_boards(boards)
+
+        try:
+            with open(self.path, "r") as file:
+                for line in file:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                        seed = record.pop("seed")
+                    except (ValueError, KeyError, AttributeError):
+                        self.skipped += 1
+                        continue
+                    yield seed, self.__encode_boards(record)
+        except FileNotFoundError:
+            pass
+
+    def load(self) -> dict:
+        """
+        Load all of the puzzles into a dict of seed to boards.
+        If a seed appears more than once, the first record is kept.
+        """
+        puzzles = dict()
+        for seed, boards in self.records():
+            puzzles.setdefault(seed, boards)
+        return puzzles
+
+    def append(self, puzzles: dict):
+        """
+        Append the given dict of seed to boards to the log.
+        The records are flushed to disk before returning, so they survive a crash once this has returned.
+        """
+        lines = [self.__encode(seed, boards)
+                 for seed, boards in puzzles.items()]
+        if not lines:
+            return
+        with open(self.path, "a+b") as file:
+            # If an earlier write was interrupted part way through a record, start on a new line so only that record is lost
+            if file.tell() > 0:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    file.write(b"\n")
+            file.write("".join(lines).encode("utf-8"))
+            file.flush()
+            os.fsync(file.fileno())
+
+    def compact(self, canonical: Optional[Callable[[dict], str]] = None, puzzles: Optional[dict] = None, rate: Optional[Callable[[dict], dict]] = None) -> int:
+        """
+        Rewrite the log with one record per seed, dropping duplicate and damaged records and merging in the legacy file.
+        If a canonical function is given, it is used to fill in the "canonical" key of records stored without one, and records with the same canonical form as an earlier record are dropped as well.
+        If a rate function is given, it is used to fill in the "rating" key of records stored without one.
+        If the puzzles have already been read using .load (and possibly had keys added), they can be given to save reading the log again.
+        The new log is written to a temporary file and moved into place, so the store is never left half written.
+        Returns the number of puzzles in the compacted log.
+        """
+        if puzzles is None:
+            puzzles = self.load()
+        written = 0
+        seen = set()
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            for seed, boards in puzzles.items():
+                if canonical is not None:
+                    if "canonical" not in boards:
+                        boards["canonical"] = canonical(boards)
+                    if boards["canonical"] in seen:
+                        continue
+                    seen.add(boards["canonical"])
+                if rate is not None and "rating" not in boards:
+                    boards["rating"] = rate(boards)
+                file.write(self.__encode(seed, boards))
+                written += 1
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+
+        # The legacy puzzles are now stored in the log
+        if self.legacy_path is not None and os.path.exists(self.legacy_path):
+            os.remove(self.legacy_path)
+        return written
+
+    @staticmethod
+    def __encode_boards(boards: dict) -> dict:
+        """Encode any boards in the dict which are still nested lists."""
+        for difficulty, board in boards.items():
+            if isinstance(board, list):
+                boards[difficulty] = encode_board(board)
+        return boards
+
+    @classmethod
+    def __encode(cls, seed: str, boards: dict) -> str:
+        """Encode a record as a single line of JSON."""
+        record = {"seed": seed}
+        record.update(cls.__encode_boards(dict(boards)))
+        return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+class PuzzleIndex(object):
+    """
+    Read only, memory mapped puzzle store made up of fixed size records, grouped into one section per difficulty.
+    Boards are grouped by the difficulty they are played as (see rated_items), so a hard board needs harder techniques to solve than an easy board, whatever number of clues it has.
+    The header lists the name, record count and offset of each section, so any record can be read directly without loading the rest of the file.
+    Seeds can be any length, so they are kept in a seed table after the sections, and each record holds the position and length of its seed in the table.
+    The hashes of the canonical forms of the puzzles (see form_hash) are kept sorted in a form table at the end, so new puzzles can be checked against the store without reading it.
+    The file is built from the records of a PuzzleLog using PuzzleIndex.build.
+        Init parameters:
+            path (str) - The location of the index file.
+        How to use:
+            Call .random_board to pick a random board of a difficulty, or .count and .record to read specific records.
+            Call .has_form to check whether an equivalent puzzle is stored.
+            Call .close when the index is no longer needed.
+    """
+
+    # File layout: magic, version, number of sections, record size, offset of the seed table and offset and length of the form table, followed by the name, record count and offset of each section
+    MAGIC = b"SUDOKUIX"
+    VERSION = 3
+    HEADER = struct.Struct("<8sHHIQQQ")
+    SECTION = struct.Struct("<16sQQ")
+
+    # Each record is the position (from the start of the seed table) and length of its seed, followed by the packed board
+    SEED = struct.Struct("<QI")
+    RECORD_SIZE = SEED.size + 41
+
+    # Each entry of the form table is a form hash
+    FORM = struct.Struct("<Q")
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            self.__map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.__map) < self.HEADER.size:
+            self.__map.close()
+            raise ValueError(f"'{path}' is not a version {self.VERSION} puzzle index")
+        magic, version, section_count, record_size, self.__seeds, self.__forms, self.__form_count = self.HEADER.unpack_from(
+            self.__map, 0)
+        if magic != self.MAGIC or version != self.VERSION or record_size != self.RECORD_SIZE:
+            self.__map.close()
+            raise ValueError(f"'{path}' is not a version {self.VERSION} puzzle index")
+
+        # Mapping of difficulty name to (record count, offset of the first record)
+        self.sections = {}
+        for i in range(section_count):
+            name, count, offset = self.SECTION.unpack_from(
+                self.__map, self.HEADER.size + i * self.SECTION.size)
+            self.sections[name.rstrip(b"\0").decode("utf-8")] = (count, offset)
+
+    def count(self, difficulty: str) -> int:
+        """Returns the number of boards stored for the given difficulty."""
+        return self.sections.get(difficulty, (0, 0))[0]
+
+    def record(self, difficulty: str, number: int) -> Tuple[str, str]:
+        """Read a single record of the given difficulty, returns the seed and encoded board."""
+        count, offset = self.sections.get(difficulty, (0, 0))
+        if not 0 <= number < count:
+            raise IndexError(f"There is no {difficulty} record {number}, {count} are stored")
+        start = offset + number * self.RECORD_SIZE
+        seed_offset, seed_size = self.SEED.unpack_from(self.__map, start)
+        seed = self.__map[self.__seeds + seed_offset:self.__seeds + seed_offset + seed_size]
+        board = self.__map[start + self.SEED.size:start + self.RECORD_SIZE]
+        return seed.decode("utf-8"), unpack_board(board)
+
+    def has_form(self, form: str) -> bool:
+        """Returns True if a puzzle with the given canonical form is stored, puzzles stored without a canonical form aren't included."""
+        value = form_hash(form)
+        # Binary search of the sorted form table
+        low, high = 0, self.__form_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.FORM.unpack_from(self.__map, self.__forms + middle * self.FORM.size)[0] < value:
+                low = middle + 1
+            else:
+                high = middle
+        return low < self.__form_count and self.FORM.unpack_from(self.__map, self.__forms + low * self.FORM.size)[0] == value
+
+    def random_board(self, difficulty: str) -> List[List[int]]:
+        """Read a random board of the given difficulty, the board is returned decoded."""
+        count = self.count(difficulty)
+        if count == 0:
+            raise IndexError(f"No {difficulty} puzzles are stored")
+        return decode_board(self.record(difficulty, random.randrange(count))[1])
+
+    def close(self):
+        """Close the memory map."""
+        self.__map.close()
+
+    @classmethod
+    def build(cls, path: str, records: Iterable[Tuple[str, dict]]) -> int:
+        """
+        Write a new index file at path from the given (seed, boards) records, such as those from PuzzleLog.records.
+        If a seed appears more than once, the first record is kept.
+        The file is written to a temporary file and moved into place, so readers never see a partly written index.
+        Returns the number of puzzles written.
+        """
+        seen = set()
+        sections = {}
+        seeds = tempfile.TemporaryFile()
+        forms = array.array("Q")
+        try:
+            # Each section and the seed table are written to their own temporary files, so the build doesn't need to hold the puzzles in memory
+            for seed, boards in records:
+                if seed in seen:
+                    continue
+                seen.add(seed)
+                # Every board of the puzzle shares the one copy of the seed
+                encoded_seed = str(seed).encode("utf-8")
+                record = cls.SEED.pack(seeds.tell(), len(encoded_seed))
+                seeds.write(encoded_seed)
+                if "canonical" in boards:
+                    forms.append(form_hash(boards["canonical"]))
+                for difficulty, board in rated_items(boards):
+                    if difficulty not in sections:
+                        sections[difficulty] = [tempfile.TemporaryFile(), 0]
+                    section = sections[difficulty]
+                    section[0].write(record + pack_board(board))
+                    section[1] += 1
+
+            temp_path = path + ".tmp"
+            with open(temp_path, "wb") as file:
+                offset = cls.HEADER.size + len(sections) * cls.SECTION.size
+                seeds_offset = offset + sum(count for _, count in sections.values()) * cls.RECORD_SIZE
+                forms_offset = seeds_offset + seeds.tell()
+                forms = sorted(forms)
+                file.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(sections), cls.RECORD_SIZE,
+                                           seeds_offset, forms_offset, len(forms)))
+                for difficulty, (_, count) in sections.items():
+                    file.write(cls.SECTION.pack(
+                        difficulty.encode("utf-8"), count, offset))
+                    offset += count * cls.RECORD_SIZE
+                for section_file, _ in sections.values():
+                    section_file.seek(0)
+                    shutil.copyfileobj(section_file, file)
+                seeds.seek(0)
+                shutil.copyfileobj(seeds, file)
+                file.write(b"".join(cls.FORM.pack(value) for value in forms))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, path)
+        finally:
+            seeds.close()
+            for section_file, _ in sections.values():
+                section_file.close()
+        return len(seen)
@@ -1,18 +1,47 @@
 #!/usr/bin/python3.7
-import pygame
-import random
+import atexit
 import time
-from tkinter import messagebox as ms_box
-from tkinter import font as tkFont
-import tkinter as tk
 import threading
-import json
 import sys
-import time
-from solver import Solver
-import generator
+from collections import OrderedDict
+from session import Session, shuffle_board
+from solver import Solver, SolverProcess, SolverProgress
 from typing import Optional, Tuple, List
 
+# pygame and tkinter are only imported when they are first needed (see load_pygame and load_tkinter), so importing this module is cheap
+pygame = None
+tk = None
+tkFont = None
+
+
+def load_pygame():
+    """Import pygame into this module, if it hasn't been imported already."""
+    global pygame
+    if pygame is None:
+        import pygame
+
+
+def load_tkinter():
+    """Import tkinter into this module, if it hasn't been imported already."""
+    global tk, tkFont
+    if tk is None:
+        import tkinter as tk
+        from tkinter import font as tkFont
+
+
+def preload():
+    """
+    Start importing pygame, opening the puzzle index and generating puzzles on a background thread.
+    This is called before the difficulty chooser is shown, so that they are ready by the time the first game starts.
+    """
+    def _preload():
+        load_pygame()
+        Game.get_puzzles()
+        Game.get_producer()
+
+    threading.Thread(target=_preload, name="Preload", daemon=True).start()
+
+
 class DifficultyChooser(object):
     """
     GUI to choose a difficulty.
@@ -24,6 +53,7 @@ class DifficultyChooser(object):
     """
 
     def __init__(self, difficulty: str):
+        load_tkinter()
         self.window = tk.Tk()
         self.window.title("Sudoku")
 
@@ -105,8 +135,56 @@ class Game(object):
             After initalising, call the .open method to open the game window.
     """
 
+    # The puzzle index and puzzle producer are opened by the first game which needs them, and shared by every game in the process
+    __puzzles = None
+    __puzzles_opened = False
+    __producer = None
+    __puzzles_lock = threading.Lock()
+
+    @classmethod
+    def get_puzzles(cls):
+        """
+        Returns the shared puzzle index, opening it if this is the first call.
+        The index is opened as it is, so that starting a game never waits for it to be built.
+        If the index is missing or older than the puzzle store, it is rebuilt on a background thread, until then this returns the old index (or None if there wasn't one).
+        """
+        with cls.__puzzles_lock:
+            if not cls.__puzzles_opened:
+                cls.__puzzles_opened = True
+                import generator
+                cls.__puzzles = generator.open_index(rebuild=False)
+                if cls.__puzzles is None or generator.index_stale():
+                    threading.Thread(target=cls.__rebuild_puzzles, name="Rebuild index", daemon=True).start()
+            return cls.__puzzles
+
+    @classmethod
+    def __rebuild_puzzles(cls):
+        """Rebuild the puzzle index from the puzzle store, then replace the shared index with it."""
+        import generator
+        generator.build_index()
+        puzzles = generator.open_index(rebuild=False)
+        with cls.__puzzles_lock:
+            cls.__puzzles = puzzles
+
+    @classmethod
+    def get_producer(cls):
+        """
+        Returns the shared puzzle producer, starting it if this is the first call.
+        The puzzles it generates are stored in the spool (see generator.open_spool), and the producer is closed when the program exits.
+        """
+        puzzles = cls.get_puzzles()
+        with cls.__puzzles_lock:
+            if cls.__producer is None:
+                import generator
+                from producer import PuzzleProducer
+                cls.__producer = PuzzleProducer(store=generator.open_spool(), index=puzzles)
+                cls.__producer.start()
+                atexit.register(cls.__producer.close)
+            return cls.__producer
+
     def __init__(self, difficulty: str, tile_size: Optional[int] = 60):
         # Pygame setup
+        load_pygame()
         pygame.init()
         pygame.font.init()
 
@@ -120,10 +198,22 @@ class Game(object):
 
         # Tile setup
         self.__tile_size = tile_size
-        self.__active_tile = [0, 0]
 
-        # Threading lock
-        self.__lock = threading.Lock()
+        # State of the current game (see session.Session), replaced by __reset
+        self.session = None
+
+        # Progress of the solver thread, sampled once per frame to move the active tile (None while fast solving)
+        self.__progress = None
+        # True from starting the solver until the frame after it finishes, while the board needs recounting each frame
+        self.__solver_running = False
+        # When fast_solve is True, the solver doesn't report its progress and the board is only drawn once it has finished
+        self.fast_solve = False
+        # When solve_in_process is True, the solver runs in a child process (see solver.SolverProcess) rather than a thread
+        self.solve_in_process = False
+        # When allow_conflicts is True, numbers which break the rules can be placed and are highlighted, rather than being rejected
+        self.allow_conflicts = False
+        # When show_hints is True, the numbers which can still go in each empty tile are shown on it
+        self.show_hints = False
 
         # Message display attributes
         self.__display_message = ""
@@ -137,62 +227,67 @@ class Game(object):
             self.__message_duration = 0
             self.__message_queue = []
             self.flash_messages(["Arrow keys, or mouse to change tile", "Press enter to self solve",
-                                 "Press r to reset the board", "Press a number to fill the current tile"], [4000, 4000, 4000, 4000])
-
-        # TODO: Is there a way to improve these key bindings?
-        self.__key_bindings = {
-            pygame.KMOD_LSHIFT: {
-                pygame.K_TAB: lambda: self.__move_active([0, -1])
-            },
-            pygame.KMOD_RSHIFT: {
-                pygame.K_TAB: lambda: self.__move_active([0, -1])
-            },
-            pygame.KMOD_NUM + pygame.KMOD_LSHIFT: {
-                pygame.K_TAB: lambda: self.__move_active([0, -1])
-            },
-            pygame.KMOD_NUM + pygame.KMOD_RSHIFT: {
-                pygame.K_TAB: lambda: self.__move_active([0, -1])
+                                 "Press f to toggle fast solving", "Press p to solve in a separate process",
+                                 "Press c to allow conflicting numbers", "Press h to show hints",
+                                 "Press r to reset the board", "Press a number to fill the current tile"], [4000] * 8)
+
+        # Actions for each key, under the modifiers which must be held: KMOD_SHIFT, KMOD_NUM (num lock on) or KMOD_NONE (any modifiers)
+        key_bindings = {
+            pygame.KMOD_SHIFT: {
+                pygame.K_TAB: lambda: self.session.move_active([0, -1])
             },
             pygame.KMOD_NUM: {
-                pygame.K_KP0: lambda: self.__set_active(0),
-                pygame.K_KP1: lambda: self.__set_active(1),
-                pygame.K_KP2: lambda: self.__set_active(2),
-                pygame.K_KP3: lambda: self.__set_active(3),
-                pygame.K_KP4: lambda: self.__set_active(4),
-                pygame.K_KP5: lambda: self.__set_active(5),
-                pygame.K_KP6: lambda: self.__set_active(6),
-                pygame.K_KP7: lambda: self.__set_active(7),
-                pygame.K_KP8: lambda: self.__set_active(8),
-                pygame.K_KP9: lambda: self.__set_active(9)
+                pygame.K_KP0: lambda: self.session.set_active(0),
+                pygame.K_KP1: lambda: self.session.set_active(1),
+                pygame.K_KP2: lambda: self.session.set_active(2),
+                pygame.K_KP3: lambda: self.session.set_active(3),
+                pygame.K_KP4: lambda: self.session.set_active(4),
+                pygame.K_KP5: lambda: self.session.set_active(5),
+                pygame.K_KP6: lambda: self.session.set_active(6),
+                pygame.K_KP7: lambda: self.session.set_active(7),
+                pygame.K_KP8: lambda: self.session.set_active(8),
+                pygame.K_KP9: lambda: self.session.set_active(9)
             },
             pygame.KMOD_NONE: {
-                pygame.K_UP: lambda: self.__move_active([-1, 0]),
-                pygame.K_DOWN: lambda: self.__move_active([1, 0]),
-                pygame.K_LEFT: lambda: self.__move_active([0, -1]),
-                pygame.K_RIGHT: lambda: self.__move_active([0, 1]),
-                pygame.K_w: lambda: self.__move_active([-1, 0]),
-                pygame.K_s: lambda: self.__move_active([1, 0]),
-                pygame.K_a: lambda: self.__move_active([0, -1]),
-                pygame.K_d: lambda: self.__move_active([0, 1]),
-                pygame.K_TAB: lambda: self.__move_active([0, 1]),
-                pygame.K_BACKSPACE: lambda: self.__set_active(0),
-                pygame.K_DELETE: lambda: self.__set_active(0),
-                pygame.K_0: lambda: self.__set_active(0),
-                pygame.K_1: lambda: self.__set_active(1),
-                pygame.K_2: lambda: self.__set_active(2),
-                pygame.K_3: lambda: self.__set_active(3),
-                pygame.K_4: lambda: self.__set_active(4),
-                pygame.K_5: lambda: self.__set_active(5),
-                pygame.K_6: lambda: self.__set_active(6),
-                pygame.K_7: lambda: self.__set_active(7),
-                pygame.K_8: lambda: self.__set_active(8),
-                pygame.K_9: lambda: self.__set_active(9),
+                pygame.K_UP: lambda: self.session.move_active([-1, 0]),
+                pygame.K_DOWN: lambda: self.session.move_active([1, 0]),
+                pygame.K_LEFT: lambda: self.session.move_active([0, -1]),
+                pygame.K_RIGHT: lambda: self.session.move_active([0, 1]),
+                pygame.K_w: lambda: self.session.move_active([-1, 0]),
+                pygame.K_s: lambda: self.session.move_active([1, 0]),
+                pygame.K_a: lambda: self.session.move_active([0, -1]),
+                pygame.K_d: lambda: self.session.move_active([0, 1]),
+                pygame.K_TAB: lambda: self.session.move_active([0, 1]),
+                pygame.K_BACKSPACE: lambda: self.session.set_active(0),
+                pygame.K_DELETE: lambda: self.session.set_active(0),
+                pygame.K_0: lambda: self.session.set_active(0),
+                pygame.K_1: lambda: self.session.set_active(1),
+                pygame.K_2: lambda: self.session.set_active(2),
+                pygame.K_3: lambda: self.session.set_active(3),
+                pygame.K_4: lambda: self.session.set_active(4),
+                pygame.K_5: lambda: self.session.set_active(5),
+                pygame.K_6: lambda: self.session.set_active(6),
+                pygame.K_7: lambda: self.session.set_active(7),
+                pygame.K_8: lambda: self.session.set_active(8),
+                pygame.K_9: lambda: self.session.set_active(9),
                 pygame.K_ESCAPE: lambda: self.close(),
                 pygame.K_r: lambda: self.__reset(),
                 pygame.K_RETURN: lambda: self.solve(),
+                pygame.K_f: lambda: self.toggle_fast_solve(),
+                pygame.K_p: lambda: self.toggle_solve_in_process(),
+                pygame.K_c: lambda: self.toggle_conflicts(),
+                pygame.K_h: lambda: self.toggle_hints(),
                 pygame.K_F1: lambda: __display_help(),
             },
         }
+        # Flattened into a single lookup of (modifier, key) to action, used by __keyHandler for each key press
+        self.__key_actions = {(mod, key): action for mod, actions in key_bindings.items()
+                              for key, action in actions.items()}
+
+        # Held keys repeat after key_repeat[0] ms, then every key_repeat[1] ms
+        self.__key_repeat = (400, 100)
+        # Time between frames in ms, frames are also drawn straight after any input
+        self.__frame_time = 10
 
         # Attribute for storing worker thread
         self.worker_thread = None
@@ -205,16 +300,57 @@ class Game(object):
         self.__tile_color = (255, 255, 255)
         self.__active_color = (255, 0, 0)
         self.__locked_color = (0, 0, 255)
-
-        # Load puzzles into memory
-        self.__puzzles = generator.load_boards()
+        self.__conflict_color = (220, 0, 0)
+        self.__hint_color = (128, 128, 128)
+
+        # Rendered text surfaces, reused until they are the least recently used of the last text_cache_size (see __render_text)
+        self.__text_cache = OrderedDict()
+        self.__text_cache_size = 64
+
+        # Pre-rendered digits for the tiles, for normal and conflicting numbers, every tile has the same background whether it is active or not
+        tile_text_color = (
+            255 - self.__tile_color[0], 255 - self.__tile_color[1], 255 - self.__tile_color[1])
+        self.__glyphs = {(value, conflict): self.__font.render(str(value), True, self.__conflict_color if conflict else tile_text_color, self.__tile_color)
+                         for value in range(1, 10) for conflict in (False, True)}
+        # Smaller digits for the hints, laid out in a 3 by 3 grid on the tile
+        hint_font = pygame.font.Font("freesansbold.ttf", tile_size // 5)
+        self.__hint_glyphs = {value: hint_font.render(str(value), True, self.__hint_color, self.__tile_color)
+                              for value in range(1, 10)}
+
+        # Nothing has been drawn yet
+        self.__invalidate()
 
         # Call reset method
         self.__reset()
     # Private methods
 
+    def __invalidate(self):
+        """Forget what has been drawn, so that the whole window is redrawn on the next frame."""
+
+        self.__full_redraw = True
+        self.__last_frame = pygame.time.get_ticks()
+        # The session, board version, active tile and hint setting when the tiles were last drawn, None if any tiles need to be redrawn
+        self.__drawn_tiles_key = None
+        # The (value, border color) of each tile as it was last drawn, None if it needs to be redrawn
+        self.__drawn_tiles = [[None] * 9 for _ in range(9)]
+        # The message and time text last drawn, and the area covered by the message
+        self.__drawn_message = None
+        self.__drawn_time = None
+        self.__message_rect = None
+
     def __draw(self):
-        """Draw everything on the window."""
+        """
+        Draw the parts of the window which have changed since the last frame.
+        The state of each tile, the message and the time are remembered when they are drawn, so only the parts which differ are redrawn, and only their areas of the window are updated.
+        If nothing has changed, the window isn't updated at all.
+        """
+
+        # Areas of the window which have been redrawn this frame
+        rects = []
+        # Time since the last frame in ms, messages are shown for their duration however often frames are drawn
+        now = pygame.time.get_ticks()
+        elapsed = now - self.__last_frame
+        self.__last_frame = now
 
         # Define draw subfunctions.
         def draw_boundaries():
@@ -229,71 +365,123 @@ class Game(object):
                 pygame.draw.rect(self.__window, self.__boundary_color,
                                  (0, y - 2, self.__windowSize[0], 4))
 
-        def draw_tiles():
-            """Draw the tiles on the screen."""
-            # For each coordinate on the board
+        def tile_rect(x: int, y: int) -> pygame.Rect:
+            """Returns the area of the window covered by a tile."""
+            # X and y are flipped here so that the tiles are drawn correctly.
+            return pygame.Rect(y * self.__tile_size + 1, x * self.__tile_size + 1,
+                               self.__tile_size - 2, self.__tile_size - 2)
+
+        def tile_state(x: int, y: int) -> Tuple[int, Optional[Tuple[int, int, int]], bool, Tuple[int, ...]]:
+            """
+            Returns what a tile looks like: its value, the color of its border (None unless the tile is active), whether its number conflicts with another, and the hints shown on it.
+            These all come from the session's counts, so nothing is scanned.
+            """
+            session = self.session
+            pos = (x, y)
+            border = None
+            if [x, y] == session.active:
+                border = self.__active_color if session.base_board[x][y] == 0 else self.__locked_color
+            hints = tuple(session.candidates(pos)) if self.show_hints else ()
+            return session.board[x][y], border, session.conflicts(pos), hints
+
+        def update_message():
+            """Move on to the next message if the current one has expired, clearing the old message from the window if it changes."""
+            # Check whether a new message needs to be displayed
+            if len(self.__message_queue) > 0 and self.__message_duration <= 0:
+                # Remove the message from the queue and add it to active variables
+                message = self.__message_queue.pop(0)
+                self.__message_duration = message[0]
+                self.__display_message = message[1]
+            message = self.__display_message if self.__message_duration > 0 else None
+            if self.__message_duration > 0:
+                self.__message_duration -= elapsed
+
+            if message != self.__drawn_message and self.__message_rect is not None:
+                # Clear the old message, and redraw the tiles it covered
+                self.__window.fill(self.__background_color, self.__message_rect)
+                rects.append(self.__message_rect)
+                for x in range(9):
+                    for y in range(9):
+                        if tile_rect(x, y).colliderect(self.__message_rect):
+                            self.__drawn_tiles[x][y] = None
+                self.__drawn_tiles_key = None
+                self.__message_rect = None
+            return message
+
+        def draw_tiles() -> bool:
+            """Draw the tiles which have changed since they were last drawn, returns True if any were drawn."""
+            drawn = False
+            # The board isn't drawn while a fast solve is running, only once it has finished
+            if self.__progress is None and self.worker_thread is not None and self.worker_thread.is_alive():
+                return drawn
+            # If nothing the tiles depend on has changed, there's no need to check each tile
+            session = self.session
+            key = (session, session.version, tuple(session.active), self.show_hints)
+            if key == self.__drawn_tiles_key:
+                return drawn
+            self.__drawn_tiles_key = key
             for x in range(0, 9):
                 for y in range(0, 9):
+                    state = tile_state(x, y)
+                    if self.__drawn_tiles[x][y] == state:
+                        continue
+                    self.__drawn_tiles[x][y] = state
+                    drawn = True
+
                     # Assign varaibles for this tile
-                    # X and y are flipped here so that the tiles are drawn correctly.
-                    tile_size = self.__tile_size - 2
-                    tile_position = [y * self.__tile_size +
-                                     1, x * self.__tile_size + 1]
+                    rect = tile_rect(x, y)
                     tile_color = self.__tile_color
-                    tile_value = self.__board[x][y]
+                    tile_value, active_tile_color, conflict, hints = state
                     # If this tile is active, draw a red boundary around it.
-                    if [x, y] == self.__active_tile:
-                        if self.__base_board[x][y] == 0:
-                            active_tile_color = self.__active_color
-                        else:
-                            active_tile_color = self.__locked_color
-                        pygame.draw.rect(self.__window, active_tile_color,
-                                         (tile_position[0], tile_position[1], tile_size, tile_size))
-                        pygame.draw.rect(self.__window, tile_color, (
-                            tile_position[0] + 2, tile_position[1] + 2, tile_size - 4, tile_size - 4))
+                    if active_tile_color is not None:
+                        pygame.draw.rect(self.__window, active_tile_color, rect)
+                        pygame.draw.rect(self.__window, tile_color, rect.inflate(-4, -4))
                     else:
-                        pygame.draw.rect(
-                            self.__window, tile_color, (tile_position[0], tile_position[1], tile_size, tile_size))
+                        pygame.draw.rect(self.__window, tile_color, rect)
 
-                    # If the tile value is not 0, draw text on the tile
+                    # If the tile value is not 0, draw its pre-rendered digit on the tile
                     if tile_value != 0:
-                        # Generate an inverted color of the text based on the tile color
-                        text_color = (
-                            255 - tile_color[0], 255 - tile_color[1], 255 - tile_color[1])
-                        # Create text object and draw it on the screen
-                        text = self.__font.render(
-                            str(tile_value), True, text_color, tile_color)
+                        text = self.__glyphs[tile_value, conflict]
                         text_rect = text.get_rect()
-                        text_rect.center = (
-                            tile_position[0] + (tile_size // 2), tile_position[1] + (tile_size // 2))
+                        text_rect.center = rect.center
                         self.__window.blit(text, text_rect)
-
-        def draw_message():
-            """Draw the current display message on the screen."""
-            # Check whether a new message needs to be displayed
-            if len(self.__message_queue) > 0 and self.__message_duration <= 0:
-                # Remove the message from the queue and add it to active variables
-                message = self.__message_queue.pop(0)
-                self.__message_duration = message[0]
-                self.__display_message = message[1]
-            # Display the message if its duration is greater than 0
-            if self.__message_duration > 0:
-                self.__message_duration -= 10
-                text_color = (
-                    255 - self.__tile_color[0], 255 - self.__tile_color[1], 255 - self.__tile_color[2])
-                text = self.__font.render(
-                    self.__display_message, True, text_color, self.__tile_color)
-                text_rect = text.get_rect()
-                text_rect.center = (
-                    self.__windowSize[0] // 2, self.__windowSize[1] // 2)
-                self.__window.blit(text, text_rect)
+                    # Draw each hint in its own place on a 3 by 3 grid, so the hints don't move as others are removed
+                    for hint in hints:
+                        text = self.__hint_glyphs[hint]
+                        text_rect = text.get_rect()
+                        text_rect.center = (rect.x + ((hint - 1) % 3 * 2 + 1) * rect.width // 6,
+                                            rect.y + ((hint - 1) // 3 * 2 + 1) * rect.height // 6)
+                        self.__window.blit(text, text_rect)
+                    rects.append(rect)
+            if drawn:
+                # The tiles overlap the edges of the boundaries, so the boundaries are drawn over them again
+                draw_boundaries()
+            return drawn
+
+        def draw_message(message: Optional[str], tiles_drawn: bool):
+            """Draw the current display message on the screen, if it has changed or any tiles have been redrawn (as the boundaries are drawn across it)."""
+            if message is None:
+                self.__drawn_message = None
+                return
+            if message == self.__drawn_message and not tiles_drawn:
+                return
+            text_color = (
+                255 - self.__tile_color[0], 255 - self.__tile_color[1], 255 - self.__tile_color[2])
+            text = self.__render_text(
+                message, text_color, self.__tile_color)
+            text_rect = text.get_rect()
+            text_rect.center = (
+                self.__windowSize[0] // 2, self.__windowSize[1] // 2)
+            self.__window.blit(text, text_rect)
+            self.__drawn_message = message
+            self.__message_rect = text_rect
+            rects.append(text_rect)
 
         def draw_time():
-            text = "Time(s): "
-            if self.end_time:
-                text += f"{round(self.end_time - self.start_time, 2)}"
-            else:
-                text += f"{round(time.time() - self.start_time, 2)}"
+            text = f"Time(s): {round(self.session.elapsed(), 2)}"
+            if text == self.__drawn_time:
+                return
+            self.__drawn_time = text
 
             # Draw a boundary at the end of the board, for the time panel
             pygame.draw.rect(self.__window, self.__boundary_color,
@@ -301,184 +489,97 @@ class Game(object):
             pygame.draw.rect(self.__window, self.__tile_color,
                              (0, self.__tile_size * 9 + 1, self.__windowSize[0], 50))
 
-            text = self.__font.render(text, True, (0, 0, 0))
-
-            self.__window.blit(text, (12.5, self.__tile_size * 9 + 12.5))
+            # The time is drawn a character at a time, so that only the few characters used need to be rendered
+            position = 12.5
+            for part in ["Time(s): "] + list(text[len("Time(s): "):]):
+                surface = self.__render_text(part, (0, 0, 0))
+                self.__window.blit(surface, (position, self.__tile_size * 9 + 12.5))
+                position += surface.get_width()
+            rects.append(pygame.Rect(0, self.__tile_size * 9,
+                                     self.__windowSize[0], self.__windowSize[1] - self.__tile_size * 9))
 
         # Call functions
-        self.__window.fill(self.__background_color)
-        draw_boundaries()
-        draw_tiles()
-        draw_message()
+        full_redraw = self.__full_redraw
+        if full_redraw:
+            self.__window.fill(self.__background_color)
+            draw_boundaries()
+            self.__full_redraw = False
+        message = update_message()
+        tiles_drawn = draw_tiles()
+        draw_message(message, tiles_drawn)
         draw_time()
-        pygame.display.update()
+        if full_redraw:
+            pygame.display.update()
+        elif rects:
+            pygame.display.update(rects)
+
+    def __render_text(self, text: str, color: Tuple[int, int, int], background: Optional[Tuple[int, int, int]] = None) -> "pygame.Surface":
+        """Returns the text rendered in the game's font, the surface is cached so the same text is only rendered once."""
+
+        key = (text, color, background)
+        surface = self.__text_cache.get(key)
+        if surface is None:
+            surface = self.__font.render(text, True, color, background)
+            self.__text_cache[key] = surface
+            if len(self.__text_cache) > self.__text_cache_size:
+                self.__text_cache.popitem(last=False)
+        else:
+            self.__text_cache.move_to_end(key)
+        return surface
 
-    def __mouseHandler(self):
-        """Handle mouse actions."""
+    def __mouseHandler(self, event: "pygame.event.Event"):
+        """Handle a mouse press or drag, moving the active tile to the tile under the cursor."""
 
-        mouse_preses = pygame.mouse.get_pressed()
-        pos = pygame.mouse.get_pos()
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button != 1:
+            return
+        if event.type == pygame.MOUSEMOTION and not event.buttons[0]:
+            return
         # Positions are reveresed here due to the way the tiles are drawn on screen
-        tile_x = pos[1] // self.__tile_size
-        tile_y = pos[0] // self.__tile_size
-        if mouse_preses[0]:
-            self.__move_active([tile_x, tile_y], absolute=True)
-
-    def __move_active(self, vector: Tuple[int, int], absolute: Optional[bool] = False):
+        tile_x = event.pos[1] // self.__tile_size
+        tile_y = event.pos[0] // self.__tile_size
+        if tile_x < 9 and tile_y < 9:
+            self.session.move_active([tile_x, tile_y], absolute=True)
+
+    def __keyHandler(self, event: "pygame.event.Event"):
+        """Handle a key press (or repeat), running the action bound to the key."""
+
+        # Bindings for the held modifiers are checked first, then those under KMOD_NONE
+        shift = pygame.KMOD_SHIFT if event.mod & pygame.KMOD_SHIFT else pygame.KMOD_NONE
+        num = pygame.KMOD_NUM if event.mod & pygame.KMOD_NUM else pygame.KMOD_NONE
+        for mod in (shift, num, pygame.KMOD_NONE):
+            action = self.__key_actions.get((mod, event.key))
+            if action is not None:
+                action()
+                return
+
+    def __load_puzzle(self, difficulty: str) -> List[List[int]]:
         """
-        Moves the active tile by the given vector when absolute is false.\n
-        Moves the active tile TO the given vector when absolute is true.
+        Returns a freshly generated puzzle from the puzzle producer, or a random puzzle from the puzzle store if none are ready.
+        If the store is empty as well (or its index hasn't been built yet), this waits for the producer to generate one.
         """
 
-        if absolute:
-            self.__active_tile = vector[:]
-        else:
-            new_active = [self.__active_tile[0] + vector[0],
-                          self.__active_tile[1] + vector[1]]
-            # If the current active tile is off the left or right of the screen, wrap back to the other side.
-            if new_active[0] == 9:
-                new_active = [0, new_active[1] + 1]
-            elif new_active[0] == -1:
-                new_active = [8, new_active[1] - 1]
-            # If the new_active is within the acceptable bounds, update the current active tile.
-            if new_active[0] < 9 and new_active[1] < 9 and new_active[0] >= 0 and new_active[1] >= 0:
-                self.__active_tile = new_active
-
-    def __set_active(self, value: int):
-        """Will set the active tile to the passed value, if it passes the __is_valid method."""
-
-        if self.__is_valid(self.__active_tile, value):
-            self.__board[self.__active_tile[0]][self.__active_tile[1]] = value
-
-    def __is_valid(self, pos: Tuple[int, int], value: int):
-        """Validates the current board setup."""
-
-        # Check whether the specified tile is writable.
-        if self.__base_board[pos[0]][pos[1]] != 0:
-            return False
-        # Check all tiles in the same group, row, and collumn as the tile in the given position
-        for x in range(9):
-            for y in range(9):
-                if value > 0:
-                    # If the tile being checked is in a position where it needs to be checked, and isnt the same as pos
-                    if (x // 3 == pos[0] // 3 and y // 3 == pos[1] // 3) or (x == pos[0] or y == pos[1]) and ([x, y] != pos):
-                        if self.__board[x][y] == value:
-                            return False
-        return True
-
-    def __keyHandler(self):
-        """Handle key presses."""
-
-        key_states = pygame.key.get_pressed()
-        mod_state = pygame.key.get_mods()
-        # Go though the mods in the key_bindings dict.
-        for mod in self.__key_bindings:
-            # Check if a mod is active and process the associated dict (this uses bitwise & operator)
-            # Keybindings that are under KMOD_NONE are always checked, regardless of the mod_state
-            if mod_state == mod or mod == 0:
-                for binds in self.__key_bindings[mod]:
-                    execute = True
-                    # If the bind in the dict is a tuple (has multiple rules), check all rules in the tuple.
-                    if isinstance(binds, tuple):
-                        # Check all keys for a bind rule.
-                        for bind in binds:
-                            if not(key_states[bind]):
-                                execute = False
-                                break
-                    else:
-                        if not(key_states[binds]):
-                            execute = False
-
-                    # If the key_state for all keys in a bind are true, execute the associated function.
-                    if execute:
-                        self.__key_bindings[mod][binds]()
-                        # Show the users change immedietly.
-                        self.__draw()
-                        # Wait for 100 ms to prevent registering the same keypress multiple times.
-                        pygame.time.delay(100)
-                        # Break to prevent different bindings using the same key(s) from triggering.
-                        break
-                break
-
-    def __load_puzzle(self, difficulty: str):
-        """
-        Loads a random puzzle from the puzzles.json file genereated by the puzzle generator.
-        The puzzle is blended and rotated, so even if the same puzzle is loaded, it should look different.
-        """
-
-        # Copy one of the boards from the puzzles dictionary for the required difficulty
-        to_copy = random.choice(list(self.__puzzles.keys()))
-        board = self.__puzzles[to_copy][difficulty]
-        self.__board = []
-        for row in board:
-            self.__board.append(row.copy())
-
-        def blender():
-            """This mixes the columns and rows randomly in order to make the board look more random."""
-            def blend_rows():
-                # Iterate over each band of 3 rows
-                for x in range(0, 9, 3):
-                    # Iterate over the 3 rows in the band.
-                    for row_num in range(x, x+3):
-                        # Select a random row from the band
-                        random_row = random.randint(x, x+2)
-                        # Switch the specified rows
-                        self.__board[row_num], self.__board[random_row] = self.__board[random_row], self.__board[row_num]
-
-            def blend_columns():
-                # Iterate over each band of 3 columns
-                for y in range(0, 9, 3):
-                    # Iterate over the 3 columns in the band.
-                    for column_num in range(y, y+3):
-                        # Select a random colu n from the band
-                        random_column = random.randint(y, y+2)
-                        # Switch the specified columns
-                        for row_num in range(0, 9):
-                            self.__board[row_num][column_num], self.__board[row_num][random_column] = self.__board[
-                                row_num][random_column], self.__board[row_num][column_num]
-
-            blend_rows()
-            blend_columns()
-
-        def rotate():
-            """Rotate the board a random multiple of 90 degrees."""
-            for _ in range(random.randint(0, 3)):
-                # Rotate board by 90 degrees
-                self.__board = [*zip(*self.__board[::-1])]
-                # Convert tuples back into lists
-                self.__board = [list(row) for row in self.__board]
-
-        blender()
-        rotate()
-        self.__base_board = []
-        for row in self.__board:
-            self.__base_board.append(row[:])
+        producer = self.get_producer()
+        board = producer.take(difficulty, timeout=0)
+        if board is None:
+            # Read one of the boards for the required difficulty from the puzzle index, if there is one yet
+            puzzles = self.get_puzzles()
+            if puzzles is not None and puzzles.count(difficulty):
+                board = puzzles.random_board(difficulty)
+            else:
+                board = producer.take(difficulty)
+        return board
 
     def __reset(self):
-        """Reset the game to its default state."""
+        """Reset the game to its default state, with a new puzzle."""
 
         if self.worker_thread:
             self.worker_thread.stop()
-        self.__load_puzzle(self.difficulty)
+        # The puzzle is shuffled, so even if the same puzzle is loaded, it should look different
+        self.session = Session(shuffle_board(self.__load_puzzle(self.difficulty)),
+                               self.allow_conflicts)
         self.worker_thread = None
-        self.complete = False
-        self.start_time = time.time()
-        self.end_time = None
-
-    def __check_win(self):
-        """Checks whether the sudoku board has been completed."""
-
-        if self.complete:
-            return False
-        else:
-            for row in self.__board:
-                for num in row:
-                    # If none of the numbers are still 0, then the board has been been completed.
-                    if num == 0:
-                        return False
-            self.complete = True
-            self.end_time = time.time()
-            return True
+        self.__progress = None
+        self.__solver_running = False
 
     # Public methods
     def flash_message(self, message: str, delay: int):
@@ -494,57 +595,112 @@ class Game(object):
         self.__message_queue += messages
 
     def solve(self):
-        """Start self-solving the current board"""
-
-        def update_active(active_pos, board):
-            """This function is used by the solver to update the active tile position, so that it is drawn on screen correctly."""
-
-            with self.__lock:
-                self.__move_active(active_pos, True)
+        """
+        Start self-solving the current board.
+        Unless fast_solve is True, the solver publishes each step to a SolverProgress which the draw loop samples once per frame.
+        If solve_in_process is True, the solver runs in a child process, and the draw loop copies the board from it each frame.
+        """
 
         # Start the solver thread if one is not already running
         if not self.worker_thread:
-            s = Solver(self.__board, False, update_active)
+            if self.solve_in_process:
+                s = SolverProcess(self.session.board, not self.fast_solve, engine="bitmask")
+                self.__progress = None if self.fast_solve else s
+            elif self.fast_solve:
+                self.__progress = None
+                s = Solver(self.session.board, False, engine="bitmask")
+            else:
+                self.__progress = SolverProgress()
+                s = Solver(self.session.board, False, self.__progress.publish, engine="bitmask")
             self.worker_thread = s
+            self.__solver_running = True
             # Reset start time so we are timing the worker thread
-            self.start_time = time.time()
+            self.session.start_time = time.time()
             self.worker_thread.start()
 
-    def open(self):
-        """Open game window, call .close method to close the window."""
+    def toggle_fast_solve(self):
+        """Turn fast solving on or off, this applies from the next self-solve."""
+
+        self.fast_solve = not self.fast_solve
+        self.flash_message(f"Fast solve {'on' if self.fast_solve else 'off'}", 1000)
+
+    def toggle_conflicts(self):
+        """Turn on or off placing numbers which break the rules, numbers which do are highlighted."""
+
+        self.allow_conflicts = not self.allow_conflicts
+        self.session.allow_conflicts = self.allow_conflicts
+        self.flash_message(f"Conflicts {'allowed' if self.allow_conflicts else 'not allowed'}", 1000)
+
+    def toggle_hints(self):
+        """Turn on or off showing the numbers which can still go in each empty tile."""
+
+        self.show_hints = not self.show_hints
+        self.flash_message(f"Hints {'on' if self.show_hints else 'off'}", 1000)
+
+    def toggle_solve_in_process(self):
+        """Turn solving in a separate process on or off, this applies from the next self-solve."""
+
+        self.solve_in_process = not self.solve_in_process
+        self.flash_message(f"Solve in process {'on' if self.solve_in_process else 'off'}", 1000)
+
+    def open(self, frames: Optional[int] = None):
+        """
+        Open game window, call .close method to close the window.
+        If frames is given, the window closes by itself after drawing that many frames (used for benchmarking).
+        """
 
         self.__running = True
-        mouseDown, keyDown = False, False
         self.flash_message("Press F1 for help.", 4000)
+        pygame.key.set_repeat(*self.__key_repeat)
+        frame_count = 0
+        next_frame = self.__last_frame = pygame.time.get_ticks()
         while self.__running:
-            # Event loop
-            for event in pygame.event.get():
+            # Sleep until an event arrives or the next frame is due, then take any other waiting events
+            events = [pygame.event.wait(max(1, next_frame - pygame.time.get_ticks()))]
+            events += pygame.event.get()
+            handled_input = False
+            for event in events:
                 if event.type == pygame.QUIT:
                     self.close()
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    mouseDown = True
-                elif event.type == pygame.MOUSEBUTTONUP:
-                    mouseDown = False
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    # The window has been uncovered, so everything needs to be drawn again
+                    self.__invalidate()
+                elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION):
+                    self.__mouseHandler(event)
+                    handled_input = True
                 elif event.type == pygame.KEYDOWN:
-                    keyDown = True
-                elif event.type == pygame.KEYUP:
-                    keyDown = False
-            # If mouseDown or keyDown are true, call their respective functions.
-            if mouseDown:
-                self.__mouseHandler()
-            if keyDown:
-                self.__keyHandler()
-
-            with self.__lock:
-                self.__draw()
-
-            if self.__check_win():
+                    self.__keyHandler(event)
+                    handled_input = True
+
+            # Draw a frame when one is due, or straight away to show the effect of any input
+            if not self.__running or not (handled_input or pygame.time.get_ticks() >= next_frame):
+                continue
+            next_frame = pygame.time.get_ticks() + self.__frame_time
+
+            # Check whether the solver is running before copying its board, so that its final board is always copied and counted
+            solver_running = self.worker_thread is not None and self.worker_thread.is_alive()
+            # Copy the board from the solver process
+            if isinstance(self.worker_thread, SolverProcess):
+                self.worker_thread.sync()
+            # The solver fills in the board directly, so the session's counts are redone while it runs, and once more after it finishes
+            if self.__solver_running:
+                self.session.recount()
+            self.__solver_running = solver_running
+            # Move the active tile to the solver's latest step, once the solver has finished the active tile is left to the player
+            if self.__progress is not None and solver_running:
+                position = self.__progress.latest[0]
+                if position is not None:
+                    self.session.move_active(position, True)
+
+            self.__draw()
+            frame_count += 1
+            if frames is not None and frame_count >= frames:
+                self.close()
+
+            if self.session.check_win():
                 # Carry out win action
                 self.flash_message(
-                    f"Complete, took {round(time.time() - self.start_time, 2)} seconds", 1000)
-            # print("Time taken: " + str(end - strt))
-            # Delay of 10 ms to set framerate to 100fps
-            pygame.time.delay(10)
+                    f"Complete, took {round(self.session.elapsed(), 2)} seconds", 1000)
         pygame.quit()
 
     def close(self):
@@ -556,6 +712,7 @@ class Game(object):
 
 
 if __name__ == "__main__":
+    preload()
     difficulty = "easy"
     while True:
         difficulty_chooser = DifficultyChooser(difficulty)